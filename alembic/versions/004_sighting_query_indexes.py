@@ -0,0 +1,39 @@
+"""Add sighting indexes for reporter history and time-window queries.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-02-15
+
+Adds:
+- idx_sightings_reporter_time (reporter_id, reported_at): serves the admin
+  "recent sightings by user" lookup without a sort; replaces idx_sightings_reporter
+- idx_sightings_time (reported_at): serves the 24h/7d dashboard windows,
+  top zones by recent sightings, and retention cleanup
+
+The existing idx_sightings_zone_time (zone, reported_at) already covers the
+per-zone recent-sightings and zone detail queries (B-tree indexes scan in
+either direction, so no DESC variant is needed).
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: str | None = "003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_sightings_reporter_time ON sightings (reporter_id, reported_at)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_sightings_time ON sightings (reported_at)")
+    # Redundant: reporter_id is the leading column of idx_sightings_reporter_time
+    op.execute("DROP INDEX IF EXISTS idx_sightings_reporter")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_sightings_reporter ON sightings (reporter_id)")
+    op.execute("DROP INDEX IF EXISTS idx_sightings_time")
+    op.execute("DROP INDEX IF EXISTS idx_sightings_reporter_time")
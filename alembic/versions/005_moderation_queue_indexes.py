@@ -0,0 +1,36 @@
+"""Add partial indexes for the moderation queue.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-02-15
+
+Adds:
+- idx_sightings_flagged (reported_at) WHERE flagged = 1
+- idx_sightings_disputed (reported_at) WHERE negative > positive with 3+ votes
+
+get_flagged_sightings queries each condition as its own UNION ALL branch, so
+both walk a small partial index newest-first instead of scanning sightings.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: str | None = "004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_sightings_flagged ON sightings (reported_at) WHERE flagged = 1")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sightings_disputed ON sightings (reported_at) "
+        "WHERE feedback_negative > feedback_positive AND feedback_positive + feedback_negative >= 3"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_sightings_disputed")
+    op.execute("DROP INDEX IF EXISTS idx_sightings_flagged")
@@ -4,15 +4,86 @@ Supports SQLite (dev) via aiosqlite and PostgreSQL (prod) via asyncpg.
 Selected automatically based on DATABASE_URL scheme.
 """
 
+import asyncio
+import contextlib
+import functools
 import logging
 import sqlite3
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Optional, TypeVar, cast
+
+from config import BAN_CHECK_TTL
 
 logger = logging.getLogger(__name__)
 
 _db: Optional["Database"] = None
 
+# Ban status is checked on every user command but the banned set is small and
+# changes rarely, so the whole set of banned IDs is kept in-process and reloaded
+# at most once per TTL. ban_user/unban_user update it directly; the TTL only
+# bounds staleness for bans applied by another process sharing the database.
+BAN_CACHE_TTL_SECONDS = BAN_CHECK_TTL
+
+# Admin dashboard aggregates are cached briefly. Writes to the tables they read
+# invalidate the cache; the TTL keeps the rolling 24h/7d windows fresh.
+STATS_CACHE_TTL_SECONDS = 30
+
+# Sightings the crowd disputes: more negative than positive votes, with 3+ votes.
+# Shared verbatim by idx_sightings_disputed and get_flagged_sightings so the
+# query planner can match the partial index.
+_DISPUTED = "feedback_negative > feedback_positive AND feedback_positive + feedback_negative >= 3"
+
+# Auto-flag threshold: over 70% negative with 3+ votes (integer form of neg / total > 0.7)
+_AUTO_FLAG = "feedback_positive + feedback_negative >= 3 AND feedback_negative * 10 > (feedback_positive + feedback_negative) * 7"
+
+# On PostgreSQL, admin audit entries are written by a background task; at most
+# this many queued entries go into one executemany. Loggers wait once the queue
+# holds AUDIT_QUEUE_MAX entries, which also bounds what a crash can lose.
+# SQLite writes them inline: its single connection gains nothing from a queue.
+AUDIT_BATCH_MAX = 100
+AUDIT_QUEUE_MAX = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class SightingIn:
+    """A new sighting to insert; add_sighting also still accepts the equivalent dict."""
+
+    id: str
+    zone: str
+    description: str | None
+    time: datetime
+    reporter_id: int
+    reporter_name: str | None
+    reporter_badge: str | None
+    lat: float | None = None
+    lng: float | None = None
+
+
+_F = TypeVar("_F", bound=Callable[..., Awaitable[Any]])
+
+
+def _invalidates_stats(method: _F) -> _F:
+    """Mark a Database write method as changing data behind the cached admin stats."""
+
+    @functools.wraps(method)
+    async def wrapper(self: "Database", *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            self._invalidate_stats()
+
+    return cast(_F, wrapper)
+
+
+def _vote_deltas(previous_vote: str | None, new_vote: str) -> tuple[int, int]:
+    """(positive, negative) count changes for replacing previous_vote with new_vote."""
+    pos_delta = (new_vote == "positive") - (previous_vote == "positive")
+    neg_delta = (new_vote == "negative") - (previous_vote == "negative")
+    return pos_delta, neg_delta
+
 
 def get_db() -> "Database":
     """Return the global Database singleton."""
@@ -49,6 +120,16 @@ class Database:
         self.driver: str = "sqlite"
         self._conn = None  # aiosqlite connection
         self._pool = None  # asyncpg pool
+        self._banned_ids: set[int] | None = None  # snapshot of banned_users, None until loaded
+        self._banned_ids_loaded_at = 0.0
+        self._banned_ids_version = 0  # bumped by ban_user/unban_user, so a reload can spot changes made mid-read
+        self._stats_cache: dict[tuple, tuple[Any, float]] = {}  # (method, *args) -> (result, cached_at)
+        self._stats_version = 0  # bumped by every write that can change a cached aggregate
+        # SQLite has one connection, and a commit from any coroutine commits everything
+        # pending on it; every SQLite write transaction holds this lock until it commits
+        self._write_lock = asyncio.Lock()
+        self._audit_queue: asyncio.Queue[tuple] = asyncio.Queue(maxsize=AUDIT_QUEUE_MAX)
+        self._audit_task: asyncio.Task | None = None
 
         if database_url and database_url.startswith(("postgresql://", "postgres://")):
             self.driver = "postgresql"
@@ -81,9 +162,16 @@ class Database:
             import asyncpg
 
             self._pool = await asyncpg.create_pool(self.database_url, min_size=2, max_size=10)
+            self._audit_task = asyncio.create_task(self._audit_writer(), name="audit-writer")
 
     async def close(self):
-        """Close the database connection."""
+        """Close the database connection, writing out any queued audit entries first."""
+        if self._audit_task is not None:
+            await self.flush_audit()
+            self._audit_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._audit_task
+            self._audit_task = None
         if self.driver == "sqlite" and self._conn:
             await self._conn.close()
         elif self.driver == "postgresql" and self._pool:
@@ -94,12 +182,25 @@ class Database:
     async def _execute(self, sql: str, params: tuple = ()) -> None:
         """Execute a write query (INSERT/UPDATE/DELETE)."""
         if self.driver == "sqlite":
-            await self._conn.execute(sql, params)
-            await self._conn.commit()
+            async with self._write_lock:
+                await self._conn.execute(sql, params)
+                await self._conn.commit()
         else:
             async with self._pool.acquire() as conn:
                 await conn.execute(sql, *params)
 
+    async def _executemany(self, sql: str, params_seq: list[tuple]) -> None:
+        """Execute a write query once per parameter tuple, committing once."""
+        if not params_seq:
+            return
+        if self.driver == "sqlite":
+            async with self._write_lock:
+                await self._conn.executemany(sql, params_seq)
+                await self._conn.commit()
+        else:
+            async with self._pool.acquire() as conn:
+                await conn.executemany(sql, params_seq)
+
     async def _fetchone(self, sql: str, params: tuple = ()) -> dict | None:
         """Execute a query and return a single row as dict, or None."""
         if self.driver == "sqlite":
@@ -122,6 +223,33 @@ class Database:
                 rows = await conn.fetch(sql, *params)
                 return [dict(r) for r in rows]
 
+    def _now(self) -> datetime:
+        """Current UTC time for the timestamps and time windows used here; tests may pin it."""
+        return datetime.now(timezone.utc)
+
+    # --- Admin stats cache ---
+
+    def _invalidate_stats(self) -> None:
+        """Drop cached dashboard aggregates after a write to users, subscriptions, sightings or feedback."""
+        self._stats_version += 1
+        self._stats_cache.clear()
+
+    async def _cached_stats(self, key: tuple, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a cached aggregate for key, computing it if missing or older than STATS_CACHE_TTL_SECONDS.
+
+        A result is only stored if no write happened while it was being computed.
+        """
+        now = time.monotonic()
+        cached = self._stats_cache.get(key)
+        if cached is not None and now - cached[1] < STATS_CACHE_TTL_SECONDS:
+            return cached[0]
+
+        version = self._stats_version
+        result = await compute()
+        if version == self._stats_version:
+            self._stats_cache[key] = (result, now)
+        return result
+
     # --- Table creation ---
 
     async def create_tables(self):
@@ -162,7 +290,8 @@ class Database:
                 PRIMARY KEY (sighting_id, user_id)
             )""",
             "CREATE INDEX IF NOT EXISTS idx_sightings_zone_time ON sightings (zone, reported_at)",
-            "CREATE INDEX IF NOT EXISTS idx_sightings_reporter ON sightings (reporter_id)",
+            "CREATE INDEX IF NOT EXISTS idx_sightings_reporter_time ON sightings (reporter_id, reported_at)",
+            "CREATE INDEX IF NOT EXISTS idx_sightings_time ON sightings (reported_at)",
             "CREATE INDEX IF NOT EXISTS idx_subscriptions_zone ON subscriptions (zone_name)",
             "CREATE INDEX IF NOT EXISTS idx_feedback_sighting ON feedback (sighting_id)",
             # Phase 8: Admin audit log
@@ -182,6 +311,9 @@ class Database:
                 reason TEXT,
                 banned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )""",
+            # Phase 9: Moderation queue (one partial index per get_flagged_sightings branch)
+            "CREATE INDEX IF NOT EXISTS idx_sightings_flagged ON sightings (reported_at) WHERE flagged = 1",
+            f"CREATE INDEX IF NOT EXISTS idx_sightings_disputed ON sightings (reported_at) WHERE {_DISPUTED}",
         ]
         if self.driver == "postgresql":
             # PostgreSQL uses SERIAL instead of AUTOINCREMENT
@@ -198,6 +330,7 @@ class Database:
         )
         return {r["zone_name"] for r in rows}
 
+    @_invalidates_stats
     async def add_subscription(self, user_id: int, zone: str) -> None:
         """Subscribe a user to a zone (idempotent)."""
         if self.driver == "sqlite":
@@ -210,6 +343,7 @@ class Database:
                 (user_id, zone),
             )
 
+    @_invalidates_stats
     async def remove_subscription(self, user_id: int, zone: str) -> None:
         """Unsubscribe a user from a single zone."""
         await self._execute(
@@ -217,6 +351,7 @@ class Database:
             (user_id, zone),
         )
 
+    @_invalidates_stats
     async def clear_subscriptions(self, user_id: int) -> None:
         """Remove all subscriptions for a user."""
         await self._execute(f"DELETE FROM subscriptions WHERE telegram_id = {self._ph(1)}", (user_id,))
@@ -233,6 +368,7 @@ class Database:
 
     # --- Users ---
 
+    @_invalidates_stats
     async def ensure_user(self, user_id: int, username: str) -> None:
         """Create user if not exists, update username if changed."""
         if self.driver == "sqlite":
@@ -268,34 +404,58 @@ class Database:
 
     # --- Sightings ---
 
-    async def add_sighting(self, sighting: dict) -> None:
-        """Insert a new sighting record."""
+    def _insert_sighting_sql(self) -> str:
         ph = self._ph
-        await self._execute(
-            f"""INSERT INTO sightings (id, zone, description, reported_at, reporter_id,
+        return f"""INSERT INTO sightings (id, zone, description, reported_at, reporter_id,
                 reporter_name, reporter_badge, lat, lng, feedback_positive, feedback_negative)
                 VALUES ({ph(1)}, {ph(2)}, {ph(3)}, {ph(4)}, {ph(5)},
-                        {ph(6)}, {ph(7)}, {ph(8)}, {ph(9)}, {ph(10)}, {ph(11)})""",
-            (
-                sighting["id"],
-                sighting["zone"],
-                sighting.get("description"),
-                sighting["time"],
-                sighting["reporter_id"],
-                sighting["reporter_name"],
-                sighting["reporter_badge"],
-                sighting.get("lat"),
-                sighting.get("lng"),
+                        {ph(6)}, {ph(7)}, {ph(8)}, {ph(9)}, {ph(10)}, {ph(11)})"""
+
+    @staticmethod
+    def _sighting_params(sighting: SightingIn | dict) -> tuple:
+        if isinstance(sighting, SightingIn):
+            return (
+                sighting.id,
+                sighting.zone,
+                sighting.description,
+                sighting.time,
+                sighting.reporter_id,
+                sighting.reporter_name,
+                sighting.reporter_badge,
+                sighting.lat,
+                sighting.lng,
                 0,
                 0,
-            ),
+            )
+        return (
+            sighting["id"],
+            sighting["zone"],
+            sighting.get("description"),
+            sighting["time"],
+            sighting["reporter_id"],
+            sighting["reporter_name"],
+            sighting["reporter_badge"],
+            sighting.get("lat"),
+            sighting.get("lng"),
+            0,
+            0,
         )
 
+    @_invalidates_stats
+    async def add_sighting(self, sighting: SightingIn | dict) -> None:
+        """Insert a new sighting record."""
+        await self._execute(self._insert_sighting_sql(), self._sighting_params(sighting))
+
+    @_invalidates_stats
+    async def add_sightings_bulk(self, sightings: list[SightingIn] | list[dict]) -> None:
+        """Insert several sighting records in one batch with a single commit."""
+        await self._executemany(self._insert_sighting_sql(), [self._sighting_params(s) for s in sightings])
+
     async def get_recent_sightings_for_zones(self, zones: set[str], expiry_minutes: int) -> list[dict]:
         """Get non-expired sightings in given zones, newest first."""
         if not zones:
             return []
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=expiry_minutes)
+        cutoff = self._now() - timedelta(minutes=expiry_minutes)
         zone_list = list(zones)
         if self.driver == "sqlite":
             placeholders = ", ".join("?" for _ in zone_list)
@@ -315,7 +475,7 @@ class Database:
 
     async def find_recent_zone_sightings(self, zone: str, window_minutes: int) -> list[dict]:
         """Find all sightings in the same zone within the duplicate window."""
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+        cutoff = self._now() - timedelta(minutes=window_minutes)
         return await self._fetchall(
             f"SELECT * FROM sightings WHERE zone = {self._ph(1)} AND reported_at > {self._ph(2)} "
             f"ORDER BY reported_at DESC",
@@ -340,14 +500,32 @@ class Database:
             return row["oldest"]
         return None
 
+    @_invalidates_stats
     async def update_feedback_counts(self, sighting_id: str, positive_delta: int, negative_delta: int) -> None:
-        """Atomically adjust feedback counts on a sighting."""
-        await self._execute(
-            f"UPDATE sightings SET feedback_positive = feedback_positive + {self._ph(1)}, "
-            f"feedback_negative = feedback_negative + {self._ph(2)} "
-            f"WHERE id = {self._ph(3)}",
-            (positive_delta, negative_delta, sighting_id),
-        )
+        """Atomically adjust feedback counts on a sighting, auto-flagging it if it crosses the threshold."""
+        if self.driver == "sqlite":
+            async with self._write_lock:
+                await self._conn.execute(
+                    "UPDATE sightings SET feedback_positive = feedback_positive + ?, "
+                    "feedback_negative = feedback_negative + ? WHERE id = ?",
+                    (positive_delta, negative_delta, sighting_id),
+                )
+                await self._conn.execute(self._auto_flag_sql(), (sighting_id,))
+                await self._conn.commit()
+        else:
+            async with self._pool.acquire() as conn, conn.transaction():
+                await conn.execute(
+                    "UPDATE sightings SET feedback_positive = feedback_positive + $1, "
+                    "feedback_negative = feedback_negative + $2 WHERE id = $3",
+                    positive_delta,
+                    negative_delta,
+                    sighting_id,
+                )
+                await conn.execute(self._auto_flag_sql(), sighting_id)
+
+    def _auto_flag_sql(self) -> str:
+        """UPDATE that flags one unflagged sighting (id = first parameter) if its feedback crosses _AUTO_FLAG."""
+        return f"UPDATE sightings SET flagged = 1 WHERE id = {self._ph(1)} AND flagged = 0 AND {_AUTO_FLAG}"
 
     async def get_sighting(self, sighting_id: str) -> dict | None:
         """Fetch a single sighting by ID."""
@@ -363,18 +541,21 @@ class Database:
         row = await self._fetchone("SELECT COUNT(*) AS cnt FROM sightings")
         return row["cnt"] if row else 0
 
+    @_invalidates_stats
     async def cleanup_old_sightings(self, retention_days: int) -> int:
         """Delete sightings older than retention_days. Returns count deleted."""
-        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        cutoff = self._now() - timedelta(days=retention_days)
         if self.driver == "sqlite":
             # Delete related feedback first
-            await self._conn.execute(
-                "DELETE FROM feedback WHERE sighting_id IN (SELECT id FROM sightings WHERE reported_at < ?)", (cutoff,)
-            )
-            cursor = await self._conn.execute("DELETE FROM sightings WHERE reported_at < ?", (cutoff,))
-            count = cursor.rowcount
-            await self._conn.commit()
-            return count
+            async with self._write_lock:
+                await self._conn.execute(
+                    "DELETE FROM feedback WHERE sighting_id IN (SELECT id FROM sightings WHERE reported_at < ?)",
+                    (cutoff,),
+                )
+                cursor = await self._conn.execute("DELETE FROM sightings WHERE reported_at < ?", (cutoff,))
+                count = cursor.rowcount
+                await self._conn.commit()
+                return count
         else:
             async with self._pool.acquire() as conn, conn.transaction():
                 await conn.execute(
@@ -398,6 +579,7 @@ class Database:
         )
         return row["vote"] if row else None
 
+    @_invalidates_stats
     async def set_feedback(self, sighting_id: str, user_id: int, vote: str) -> None:
         """Set or update a user's feedback vote (upsert)."""
         if self.driver == "sqlite":
@@ -415,101 +597,84 @@ class Database:
 
     # --- Transaction-safe feedback ---
 
+    @_invalidates_stats
     async def apply_feedback(self, sighting_id: str, user_id: int, new_vote: str) -> dict | None:
-        """Atomically apply a feedback vote: read previous, upsert vote, update counts.
+        """Atomically apply a feedback vote: read previous, upsert vote, update counts, auto-flag.
+
+        The count update returns the updated row, and only a negative vote can push
+        a sighting over the auto-flag threshold, so a vote costs at most four statements.
 
         Returns the updated sighting dict, or None if sighting not found.
         Raises ValueError if user already submitted the same vote.
         """
+        counts_sql = (
+            f"UPDATE sightings SET feedback_positive = feedback_positive + {self._ph(1)}, "
+            f"feedback_negative = feedback_negative + {self._ph(2)} WHERE id = {self._ph(3)} RETURNING *"
+        )
         if self.driver == "sqlite":
             # SQLite: use the single connection; manual transaction via commit at end
-            try:
-                previous_row = await self._conn.execute(
-                    "SELECT vote FROM feedback WHERE sighting_id = ? AND user_id = ?", (sighting_id, user_id)
-                )
-                previous = await previous_row.fetchone()
-                previous_vote = dict(previous)["vote"] if previous else None
-
-                if previous_vote == new_vote:
-                    raise ValueError("duplicate_vote")
-
-                # Reverse old vote if changing
-                pos_delta, neg_delta = 0, 0
-                if previous_vote == "positive":
-                    pos_delta -= 1
-                elif previous_vote == "negative":
-                    neg_delta -= 1
-
-                # Apply new vote
-                if new_vote == "positive":
-                    pos_delta += 1
-                else:
-                    neg_delta += 1
-
-                # Upsert feedback
-                await self._conn.execute(
-                    "INSERT INTO feedback (sighting_id, user_id, vote) VALUES (?, ?, ?) "
-                    "ON CONFLICT(sighting_id, user_id) DO UPDATE SET vote = excluded.vote",
-                    (sighting_id, user_id, new_vote),
-                )
-
-                # Update counts
-                await self._conn.execute(
-                    "UPDATE sightings SET feedback_positive = feedback_positive + ?, "
-                    "feedback_negative = feedback_negative + ? WHERE id = ?",
-                    (pos_delta, neg_delta, sighting_id),
-                )
-
-                await self._conn.commit()
-
-                # Fetch updated sighting
-                cursor = await self._conn.execute("SELECT * FROM sightings WHERE id = ?", (sighting_id,))
-                row = await cursor.fetchone()
-                return dict(row) if row else None
-            except ValueError:
-                raise
-            except Exception:
-                await self._conn.commit()  # release any partial state
-                raise
+            async with self._write_lock:
+                try:
+                    previous_row = await self._conn.execute(
+                        "SELECT vote FROM feedback WHERE sighting_id = ? AND user_id = ?", (sighting_id, user_id)
+                    )
+                    previous = await previous_row.fetchone()
+                    previous_vote = dict(previous)["vote"] if previous else None
+
+                    if previous_vote == new_vote:
+                        raise ValueError("duplicate_vote")
+
+                    # Upsert feedback
+                    await self._conn.execute(
+                        "INSERT INTO feedback (sighting_id, user_id, vote) VALUES (?, ?, ?) "
+                        "ON CONFLICT(sighting_id, user_id) DO UPDATE SET vote = excluded.vote",
+                        (sighting_id, user_id, new_vote),
+                    )
+
+                    # Update counts; the RETURNING row must be read before committing
+                    cursor = await self._conn.execute(counts_sql, (*_vote_deltas(previous_vote, new_vote), sighting_id))
+                    row = await cursor.fetchone()
+                    sighting = dict(row) if row else None
+                    if sighting and new_vote == "negative":
+                        cursor = await self._conn.execute(self._auto_flag_sql(), (sighting_id,))
+                        if cursor.rowcount:
+                            sighting["flagged"] = 1
+                            logger.info(f"Auto-flagged sighting {sighting_id} after negative feedback")
+
+                    await self._conn.commit()
+                    return sighting
+                except ValueError:
+                    raise
+                except Exception:
+                    await self._conn.commit()  # release any partial state
+                    raise
         else:
             async with self._pool.acquire() as conn, conn.transaction():
-                previous_row = await conn.fetchrow(
-                    "SELECT vote FROM feedback WHERE sighting_id = $1 AND user_id = $2", sighting_id, user_id
-                )
-                previous_vote = dict(previous_row)["vote"] if previous_row else None
-
-                if previous_vote == new_vote:
-                    raise ValueError("duplicate_vote")
-
-                pos_delta, neg_delta = 0, 0
-                if previous_vote == "positive":
-                    pos_delta -= 1
-                elif previous_vote == "negative":
-                    neg_delta -= 1
-
-                if new_vote == "positive":
-                    pos_delta += 1
-                else:
-                    neg_delta += 1
-
-                await conn.execute(
+                # Read the previous vote and upsert in one round trip: the CTE sees the
+                # table as it was before the statement, and an unchanged vote returns no row
+                upserted = await conn.fetchrow(
+                    "WITH previous AS (SELECT vote FROM feedback WHERE sighting_id = $1 AND user_id = $2) "
                     "INSERT INTO feedback (sighting_id, user_id, vote) VALUES ($1, $2, $3) "
-                    "ON CONFLICT (sighting_id, user_id) DO UPDATE SET vote = EXCLUDED.vote",
+                    "ON CONFLICT (sighting_id, user_id) DO UPDATE SET vote = EXCLUDED.vote "
+                    "WHERE feedback.vote <> EXCLUDED.vote "
+                    "RETURNING (SELECT vote FROM previous) AS previous_vote",
                     sighting_id,
                     user_id,
                     new_vote,
                 )
+                if upserted is None:
+                    raise ValueError("duplicate_vote")
 
-                await conn.execute(
-                    "UPDATE sightings SET feedback_positive = feedback_positive + $1, "
-                    "feedback_negative = feedback_negative + $2 WHERE id = $3",
-                    pos_delta,
-                    neg_delta,
-                    sighting_id,
-                )
-
-                row = await conn.fetchrow("SELECT * FROM sightings WHERE id = $1", sighting_id)
-                return dict(row) if row else None
+                row = await conn.fetchrow(counts_sql, *_vote_deltas(upserted["previous_vote"], new_vote), sighting_id)
+                sighting = dict(row) if row else None
+                if (
+                    sighting
+                    and new_vote == "negative"
+                    and await conn.execute(self._auto_flag_sql(), sighting_id) == "UPDATE 1"
+                ):
+                    sighting["flagged"] = 1
+                    logger.info(f"Auto-flagged sighting {sighting_id} after negative feedback")
+                return sighting
 
     # --- Accuracy (aggregate queries) ---
 
@@ -547,78 +712,142 @@ class Database:
 
     # --- Phase 8: Admin — Audit Logging ---
 
-    async def log_admin_action(
-        self, admin_id: int, action: str, target: str | None = None, detail: str | None = None
-    ) -> None:
-        """Record an admin action in the audit log."""
+    def _insert_admin_action_sql(self) -> str:
         ph = self._ph
-        await self._execute(
+        return (
             f"INSERT INTO admin_actions (admin_id, action, target, detail, created_at) "
-            f"VALUES ({ph(1)}, {ph(2)}, {ph(3)}, {ph(4)}, {ph(5)})",
-            (admin_id, action, target, detail, datetime.now(timezone.utc)),
+            f"VALUES ({ph(1)}, {ph(2)}, {ph(3)}, {ph(4)}, {ph(5)})"
         )
 
-    async def get_admin_log(self, limit: int = 20) -> list[dict]:
-        """Get the most recent admin actions."""
+    async def log_admin_action(
+        self, admin_id: int, action: str, target: str | None = None, detail: str | None = None
+    ) -> None:
+        """Record an admin action in the audit log.
+
+        On PostgreSQL the entry is queued for the background audit writer, so callers
+        don't wait for the INSERT. Reads of admin_actions flush the queue first.
+        """
+        await self.log_admin_actions_bulk([(admin_id, action, target, detail)])
+
+    async def log_admin_actions_bulk(self, actions: list[tuple[int, str, str | None, str | None]]) -> None:
+        """Record several (admin_id, action, target, detail) audit entries."""
+        now = self._now()
+        if self._audit_task is None:  # SQLite, or the writer isn't running (not connected yet, or closing)
+            await self._executemany(self._insert_admin_action_sql(), [(*action, now) for action in actions])
+            return
+        for action in actions:
+            await self._audit_queue.put((*action, now))
+
+    async def flush_audit(self) -> None:
+        """Wait until every queued audit entry has been written."""
+        await self._audit_queue.join()
+
+    async def _audit_writer(self) -> None:
+        """Background task: write queued audit entries, coalescing whatever has piled up into one batch."""
+        while True:
+            batch = [await self._audit_queue.get()]
+            while len(batch) < AUDIT_BATCH_MAX and not self._audit_queue.empty():
+                batch.append(self._audit_queue.get_nowait())
+            try:
+                await self._executemany(self._insert_admin_action_sql(), batch)
+            except Exception:
+                logger.exception("Failed to write %d admin audit entries", len(batch))
+            finally:
+                for _ in batch:
+                    self._audit_queue.task_done()
+
+    async def get_admin_log(self, limit: int = 20, before_id: int | None = None) -> list[dict]:
+        """Get the most recent admin actions, newest first.
+
+        Pass the smallest id of the previous page as before_id to fetch the next one
+        (keyset pagination over the primary key, so deep pages cost the same as the first).
+        """
+        await self.flush_audit()
+        if before_id is None:
+            return await self._fetchall(
+                f"SELECT * FROM admin_actions ORDER BY id DESC LIMIT {self._ph(1)}",
+                (limit,),
+            )
         return await self._fetchall(
-            f"SELECT * FROM admin_actions ORDER BY created_at DESC LIMIT {self._ph(1)}",
-            (limit,),
+            f"SELECT * FROM admin_actions WHERE id < {self._ph(1)} ORDER BY id DESC LIMIT {self._ph(2)}",
+            (before_id, limit),
         )
 
     # --- Phase 8: Admin — Global Statistics ---
 
-    async def get_global_stats(self) -> dict:
-        """Get global statistics for the admin dashboard."""
-        now = datetime.now(timezone.utc)
-        seven_days_ago = now - timedelta(days=7)
-        twenty_four_hours_ago = now - timedelta(hours=24)
+    async def get_global_stats(self, now: datetime | None = None) -> dict:
+        """Get global statistics for the admin dashboard (cached, see STATS_CACHE_TTL_SECONDS).
+
+        The 24h/7d windows end at now (default: the current time); an explicit now bypasses the cache.
+        """
+        if now is not None:
+            return await self._query_global_stats(now)
+        return await self._cached_stats(("global_stats",), self._query_global_stats)
 
-        total_users = await self._fetchone("SELECT COUNT(*) AS cnt FROM users")
-        total_sightings = await self._fetchone("SELECT COUNT(*) AS cnt FROM sightings")
-        sightings_24h = await self._fetchone(
-            f"SELECT COUNT(*) AS cnt FROM sightings WHERE reported_at > {self._ph(1)}",
-            (twenty_four_hours_ago,),
+    async def get_top_zones_by_subscribers(self, limit: int = 5) -> list[dict]:
+        """Get zones with the most subscribers (cached)."""
+        return await self._cached_stats(
+            ("top_zones_by_subscribers", limit), functools.partial(self._query_top_zones_by_subscribers, limit)
         )
-        active_subs = await self._fetchone("SELECT COUNT(*) AS cnt FROM subscriptions")
-        unique_subscribers = await self._fetchone("SELECT COUNT(DISTINCT telegram_id) AS cnt FROM subscriptions")
-        feedback_totals = await self._fetchone(
-            "SELECT COALESCE(SUM(feedback_positive), 0) AS pos, "
-            "COALESCE(SUM(feedback_negative), 0) AS neg FROM sightings"
+
+    async def get_top_zones_by_sightings(
+        self, limit: int = 5, days: int = 7, now: datetime | None = None
+    ) -> list[dict]:
+        """Get zones with the most sightings in the N days before now (cached unless now is given)."""
+        if now is not None:
+            return await self._query_top_zones_by_sightings(limit, days, now)
+        return await self._cached_stats(
+            ("top_zones_by_sightings", limit, days),
+            functools.partial(self._query_top_zones_by_sightings, limit, days),
         )
 
+    async def _query_global_stats(self, now: datetime | None = None) -> dict:
+        """Compute the global dashboard counters.
+
+        All counters come from one statement: sighting counters share a single scan
+        via conditional aggregation, the other tables are read by scalar subqueries.
+        """
+        now = now or self._now()
+        seven_days_ago = now - timedelta(days=7)
+        twenty_four_hours_ago = now - timedelta(hours=24)
+        ph = self._ph
+
         # Active users: reported or gave feedback in last 7 days
-        active_reporters = await self._fetchone(
-            f"SELECT COUNT(DISTINCT reporter_id) AS cnt FROM sightings WHERE reported_at > {self._ph(1)}",
-            (seven_days_ago,),
-        )
-        active_feedback_givers = await self._fetchone(
-            f"SELECT COUNT(DISTINCT user_id) AS cnt FROM feedback WHERE created_at > {self._ph(1)}",
-            (seven_days_ago,),
+        row = await self._fetchone(
+            f"""SELECT
+                (SELECT COUNT(*) FROM users) AS total_users,
+                COUNT(DISTINCT CASE WHEN reported_at > {ph(1)} THEN reporter_id END) AS active_reporters_7d,
+                (SELECT COUNT(DISTINCT user_id) FROM feedback WHERE created_at > {ph(2)}) AS active_feedback_givers_7d,
+                COUNT(*) AS total_sightings,
+                COUNT(CASE WHEN reported_at > {ph(3)} THEN 1 END) AS sightings_24h,
+                (SELECT COUNT(*) FROM subscriptions) AS active_subscriptions,
+                (SELECT COUNT(DISTINCT telegram_id) FROM subscriptions) AS unique_subscribers,
+                COALESCE(SUM(feedback_positive), 0) AS feedback_positive,
+                COALESCE(SUM(feedback_negative), 0) AS feedback_negative
+            FROM sightings""",
+            (seven_days_ago, seven_days_ago, twenty_four_hours_ago),
         )
-
-        return {
-            "total_users": total_users["cnt"] if total_users else 0,
-            "active_reporters_7d": active_reporters["cnt"] if active_reporters else 0,
-            "active_feedback_givers_7d": active_feedback_givers["cnt"] if active_feedback_givers else 0,
-            "total_sightings": total_sightings["cnt"] if total_sightings else 0,
-            "sightings_24h": sightings_24h["cnt"] if sightings_24h else 0,
-            "active_subscriptions": active_subs["cnt"] if active_subs else 0,
-            "unique_subscribers": unique_subscribers["cnt"] if unique_subscribers else 0,
-            "feedback_positive": feedback_totals["pos"] if feedback_totals else 0,
-            "feedback_negative": feedback_totals["neg"] if feedback_totals else 0,
+        return row or {
+            "total_users": 0,
+            "active_reporters_7d": 0,
+            "active_feedback_givers_7d": 0,
+            "total_sightings": 0,
+            "sightings_24h": 0,
+            "active_subscriptions": 0,
+            "unique_subscribers": 0,
+            "feedback_positive": 0,
+            "feedback_negative": 0,
         }
 
-    async def get_top_zones_by_subscribers(self, limit: int = 5) -> list[dict]:
-        """Get zones with the most subscribers."""
+    async def _query_top_zones_by_subscribers(self, limit: int) -> list[dict]:
         return await self._fetchall(
             f"SELECT zone_name, COUNT(*) AS sub_count FROM subscriptions "
             f"GROUP BY zone_name ORDER BY sub_count DESC LIMIT {self._ph(1)}",
             (limit,),
         )
 
-    async def get_top_zones_by_sightings(self, limit: int = 5, days: int = 7) -> list[dict]:
-        """Get zones with the most sightings in the last N days."""
-        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    async def _query_top_zones_by_sightings(self, limit: int, days: int, now: datetime | None = None) -> list[dict]:
+        cutoff = (now or self._now()) - timedelta(days=days)
         return await self._fetchall(
             f"SELECT zone, COUNT(*) AS sighting_count FROM sightings "
             f"WHERE reported_at > {self._ph(1)} "
@@ -660,35 +889,33 @@ class Database:
         )
         return [r["zone_name"] for r in rows]
 
-    async def get_zone_details(self, zone_name: str) -> dict:
-        """Get detailed zone information for admin lookup."""
-        now = datetime.now(timezone.utc)
+    async def get_zone_details(self, zone_name: str, now: datetime | None = None) -> dict:
+        """Get detailed zone information for admin lookup.
+
+        The three sighting windows, ending at now (default: the current time), are
+        counted in one pass over the zone's sightings.
+        """
+        now = now or self._now()
         twenty_four_hours_ago = now - timedelta(hours=24)
         seven_days_ago = now - timedelta(days=7)
+        ph = self._ph
 
-        sub_count = await self._fetchone(
-            f"SELECT COUNT(*) AS cnt FROM subscriptions WHERE zone_name = {self._ph(1)}",
-            (zone_name,),
-        )
-        sightings_24h = await self._fetchone(
-            f"SELECT COUNT(*) AS cnt FROM sightings WHERE zone = {self._ph(1)} AND reported_at > {self._ph(2)}",
-            (zone_name, twenty_four_hours_ago),
-        )
-        sightings_7d = await self._fetchone(
-            f"SELECT COUNT(*) AS cnt FROM sightings WHERE zone = {self._ph(1)} AND reported_at > {self._ph(2)}",
-            (zone_name, seven_days_ago),
-        )
-        sightings_all = await self._fetchone(
-            f"SELECT COUNT(*) AS cnt FROM sightings WHERE zone = {self._ph(1)}",
-            (zone_name,),
+        row = await self._fetchone(
+            f"""SELECT
+                (SELECT COUNT(*) FROM subscriptions WHERE zone_name = {ph(1)}) AS subscriber_count,
+                COUNT(CASE WHEN reported_at > {ph(2)} THEN 1 END) AS sightings_24h,
+                COUNT(CASE WHEN reported_at > {ph(3)} THEN 1 END) AS sightings_7d,
+                COUNT(*) AS sightings_all
+            FROM sightings WHERE zone = {ph(4)}""",
+            (zone_name, twenty_four_hours_ago, seven_days_ago, zone_name),
         )
 
         return {
             "zone_name": zone_name,
-            "subscriber_count": sub_count["cnt"] if sub_count else 0,
-            "sightings_24h": sightings_24h["cnt"] if sightings_24h else 0,
-            "sightings_7d": sightings_7d["cnt"] if sightings_7d else 0,
-            "sightings_all": sightings_all["cnt"] if sightings_all else 0,
+            "subscriber_count": row["subscriber_count"] if row else 0,
+            "sightings_24h": row["sightings_24h"] if row else 0,
+            "sightings_7d": row["sightings_7d"] if row else 0,
+            "sightings_all": row["sightings_all"] if row else 0,
         }
 
     async def get_zone_top_reporters(self, zone_name: str, limit: int = 5) -> list[dict]:
@@ -711,23 +938,34 @@ class Database:
 
     # --- Phase 9: User Banning ---
 
+    @_invalidates_stats
     async def ban_user(self, user_id: int, banned_by: int, reason: str | None = None) -> None:
-        """Ban a user: insert into banned_users and clear their subscriptions."""
-        now = datetime.now(timezone.utc)
+        """Ban a user: insert into banned_users and clear their subscriptions in one transaction."""
+        now = self._now()
         if self.driver == "sqlite":
-            await self._execute(
-                "INSERT OR REPLACE INTO banned_users (telegram_id, banned_by, reason, banned_at) VALUES (?, ?, ?, ?)",
-                (user_id, banned_by, reason, now),
-            )
+            async with self._write_lock:
+                await self._conn.execute(
+                    "INSERT OR REPLACE INTO banned_users (telegram_id, banned_by, reason, banned_at) VALUES (?, ?, ?, ?)",
+                    (user_id, banned_by, reason, now),
+                )
+                await self._conn.execute("DELETE FROM subscriptions WHERE telegram_id = ?", (user_id,))
+                await self._conn.commit()
         else:
-            await self._execute(
-                "INSERT INTO banned_users (telegram_id, banned_by, reason, banned_at) "
-                "VALUES ($1, $2, $3, $4) "
-                "ON CONFLICT (telegram_id) DO UPDATE SET banned_by = EXCLUDED.banned_by, "
-                "reason = EXCLUDED.reason, banned_at = EXCLUDED.banned_at",
-                (user_id, banned_by, reason, now),
-            )
-        await self.clear_subscriptions(user_id)
+            async with self._pool.acquire() as conn, conn.transaction():
+                await conn.execute(
+                    "INSERT INTO banned_users (telegram_id, banned_by, reason, banned_at) "
+                    "VALUES ($1, $2, $3, $4) "
+                    "ON CONFLICT (telegram_id) DO UPDATE SET banned_by = EXCLUDED.banned_by, "
+                    "reason = EXCLUDED.reason, banned_at = EXCLUDED.banned_at",
+                    user_id,
+                    banned_by,
+                    reason,
+                    now,
+                )
+                await conn.execute("DELETE FROM subscriptions WHERE telegram_id = $1", user_id)
+        self._banned_ids_version += 1
+        if self._banned_ids is not None:
+            self._banned_ids.add(user_id)
 
     async def unban_user(self, user_id: int) -> bool:
         """Remove a ban. Returns True if the user was actually banned."""
@@ -738,14 +976,28 @@ class Database:
         if not row:
             return False
         await self._execute(f"DELETE FROM banned_users WHERE telegram_id = {self._ph(1)}", (user_id,))
+        self._banned_ids_version += 1
+        if self._banned_ids is not None:
+            self._banned_ids.discard(user_id)
         return True
 
     async def is_banned(self, user_id: int) -> bool:
-        """Check if a user is currently banned."""
-        row = await self._fetchone(
-            f"SELECT telegram_id FROM banned_users WHERE telegram_id = {self._ph(1)}", (user_id,)
-        )
-        return row is not None
+        """Check if a user is currently banned.
+
+        Answered from the in-memory set of banned IDs, reloaded from the database
+        at most every BAN_CACHE_TTL_SECONDS. A reload that overlapped a ban or unban
+        is read again, so it can't overwrite that change with an older snapshot.
+        """
+        now = time.monotonic()
+        if self._banned_ids is None or now - self._banned_ids_loaded_at >= BAN_CACHE_TTL_SECONDS:
+            while True:
+                version = self._banned_ids_version
+                rows = await self._fetchall("SELECT telegram_id FROM banned_users")
+                if version == self._banned_ids_version:
+                    break
+            self._banned_ids = {row["telegram_id"] for row in rows}
+            self._banned_ids_loaded_at = now
+        return user_id in self._banned_ids
 
     async def get_banned_users(self) -> list[dict]:
         """Get all currently banned users, newest bans first."""
@@ -755,6 +1007,7 @@ class Database:
 
     # --- Phase 9: Sighting Moderation ---
 
+    @_invalidates_stats
     async def delete_sighting(self, sighting_id: str) -> dict | None:
         """Delete a sighting by ID. Returns the sighting data before deletion, or None."""
         sighting = await self.get_sighting(sighting_id)
@@ -768,26 +1021,55 @@ class Database:
         """Mark a sighting as flagged for review."""
         await self._execute(f"UPDATE sightings SET flagged = 1 WHERE id = {self._ph(1)}", (sighting_id,))
 
+    async def auto_flag_sighting(self, sighting_id: str) -> bool:
+        """Flag a sighting if its feedback crosses the auto-flag threshold. Returns True if it was flagged now."""
+        if self.driver == "sqlite":
+            async with self._write_lock:
+                cursor = await self._conn.execute(self._auto_flag_sql(), (sighting_id,))
+                await self._conn.commit()
+                return cursor.rowcount > 0
+        async with self._pool.acquire() as conn:
+            return await conn.execute(self._auto_flag_sql(), sighting_id) == "UPDATE 1"
+
     async def get_flagged_sightings(self, limit: int = 20) -> list[dict]:
         """Get sightings flagged for moderation review.
 
         Returns sightings that are either:
         - Explicitly flagged (flagged = 1)
         - Have negative feedback > positive feedback with 3+ total votes
+        The two conditions are queried as separate UNION ALL branches so each walks
+        its own partial index (idx_sightings_flagged, idx_sightings_disputed);
+        an OR across them would scan the whole table.
         """
+        ph = self._ph
         return await self._fetchall(
-            f"SELECT * FROM sightings WHERE "
-            f"flagged = 1 OR "
-            f"(feedback_negative > feedback_positive AND (feedback_positive + feedback_negative) >= 3) "
-            f"ORDER BY reported_at DESC LIMIT {self._ph(1)}",
-            (limit,),
+            f"""SELECT * FROM (
+                SELECT * FROM sightings WHERE flagged = 1 ORDER BY reported_at DESC LIMIT {ph(1)}
+            ) AS explicit
+            UNION ALL
+            SELECT * FROM (
+                SELECT * FROM sightings WHERE flagged = 0 AND {_DISPUTED} ORDER BY reported_at DESC LIMIT {ph(2)}
+            ) AS disputed
+            ORDER BY reported_at DESC LIMIT {ph(3)}""",
+            (limit, limit, limit),
         )
 
     async def get_low_accuracy_reporters(self, max_accuracy: float = 0.5, min_feedback: int = 5) -> list[dict]:
-        """Get reporters whose accuracy is below the threshold.
+        """Get reporters whose accuracy is below the threshold (cached, see STATS_CACHE_TTL_SECONDS).
 
         Returns users with accuracy < max_accuracy and at least min_feedback total ratings.
         """
+        return await self._cached_stats(
+            ("low_accuracy_reporters", max_accuracy, min_feedback),
+            functools.partial(self._query_low_accuracy_reporters, max_accuracy, min_feedback),
+        )
+
+    async def _query_low_accuracy_reporters(self, max_accuracy: float, min_feedback: int) -> list[dict]:
+        ph = self._ph
+        # Both thresholds are applied in SQL. The ratio is computed before comparing, as
+        # in Python, so a reporter exactly at max_accuracy is never flagged (pos < max * total
+        # is not equivalent under float rounding: 0.55 * 100 > 55). min_feedback >= 1 keeps
+        # the total nonzero; the casts make PostgreSQL divide and compare as floats.
         rows = await self._fetchall(
             f"SELECT reporter_id, "
             f"SUM(feedback_positive) AS total_pos, "
@@ -795,23 +1077,21 @@ class Database:
             f"COUNT(*) AS sighting_count "
             f"FROM sightings "
             f"GROUP BY reporter_id "
-            f"HAVING (SUM(feedback_positive) + SUM(feedback_negative)) >= {self._ph(1)}",
-            (min_feedback,),
+            f"HAVING SUM(feedback_positive) + SUM(feedback_negative) >= {ph(1)} "
+            f"AND CAST(SUM(feedback_positive) AS FLOAT) / NULLIF(SUM(feedback_positive) + SUM(feedback_negative), 0) "
+            f"< CAST({ph(2)} AS FLOAT)",
+            (max(min_feedback, 1), max_accuracy),
         )
-        result = []
-        for r in rows:
-            total = r["total_pos"] + r["total_neg"]
-            if total > 0 and r["total_pos"] / total < max_accuracy:
-                result.append(
-                    {
-                        "reporter_id": r["reporter_id"],
-                        "total_positive": r["total_pos"],
-                        "total_negative": r["total_neg"],
-                        "accuracy": r["total_pos"] / total,
-                        "sighting_count": r["sighting_count"],
-                    }
-                )
-        return result
+        return [
+            {
+                "reporter_id": r["reporter_id"],
+                "total_positive": r["total_pos"],
+                "total_negative": r["total_neg"],
+                "accuracy": r["total_pos"] / (r["total_pos"] + r["total_neg"]),
+                "sighting_count": r["sighting_count"],
+            }
+            for r in rows
+        ]
 
     # --- Phase 9: Reporter Warnings ---
 
@@ -822,14 +1102,15 @@ class Database:
 
     async def increment_warnings(self, user_id: int) -> int:
         """Increment warning count for a user. Returns the new count."""
+        sql = f"UPDATE users SET warnings = warnings + 1 WHERE telegram_id = {self._ph(1)} RETURNING warnings"
         if self.driver == "sqlite":
-            await self._execute("UPDATE users SET warnings = warnings + 1 WHERE telegram_id = ?", (user_id,))
-            row = await self._fetchone("SELECT warnings FROM users WHERE telegram_id = ?", (user_id,))
-        else:
-            row = await self._fetchone(
-                "UPDATE users SET warnings = warnings + 1 WHERE telegram_id = $1 RETURNING warnings",
-                (user_id,),
-            )
+            # RETURNING needs SQLite 3.35+; the row must be read before committing
+            async with self._write_lock:
+                cursor = await self._conn.execute(sql, (user_id,))
+                sqlite_row = await cursor.fetchone()
+                await self._conn.commit()
+                return sqlite_row["warnings"] if sqlite_row else 0
+        row = await self._fetchone(sql, (user_id,))
         return row["warnings"] if row else 0
 
     async def reset_warnings(self, user_id: int) -> None:
@@ -839,12 +1120,13 @@ class Database:
     # --- Phase 10: User Feedback Rate Limiting ---
 
     async def get_all_user_ids(self) -> list[int]:
-        """Get all registered user IDs (for broadcast)."""
-        rows = await self._fetchall("SELECT telegram_id FROM users")
+        """Get all registered user IDs in ascending order (for broadcast)."""
+        rows = await self._fetchall("SELECT telegram_id FROM users ORDER BY telegram_id")
         return [r["telegram_id"] for r in rows]
 
     async def count_user_feedback_since(self, user_id: int, since: datetime) -> int:
         """Count feedback messages sent by a user since a given time (for rate limiting)."""
+        await self.flush_audit()
         row = await self._fetchone(
             f"SELECT COUNT(*) AS cnt FROM admin_actions "
             f"WHERE action = 'user_feedback' AND target = {self._ph(1)} AND created_at > {self._ph(2)}",
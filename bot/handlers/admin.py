@@ -13,7 +13,7 @@ from config import ADMIN_USER_IDS, MAX_WARNINGS
 
 from ..database import get_db
 from ..utils import SGT, get_accuracy_indicator, get_reporter_badge
-from ..zones import ZONES
+from ..zones import ZONES, resolve_zone
 
 logger = logging.getLogger(__name__)
 
@@ -142,6 +142,9 @@ ADMIN_COMMANDS_DETAILED = {
     ),
 }
 
+# Bare command names from ADMIN_COMMANDS_HELP, e.g. "ban" for "ban <user_id> [reason]"
+ADMIN_COMMAND_NAMES = frozenset(key.split(maxsplit=1)[0] for key in ADMIN_COMMANDS_HELP)
+
 
 @admin_only
 async def admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -362,26 +365,10 @@ async def _admin_zone(update: Update, context: ContextTypes.DEFAULT_TYPE, args:
     db = get_db()
     admin_id = update.effective_user.id
 
-    # Validate zone exists
-    zone_name = args
-    zone_exists = False
-    for region in ZONES.values():
-        if zone_name in region["zones"]:
-            zone_exists = True
-            break
-
-    if not zone_exists:
-        # Try case-insensitive match
-        for region in ZONES.values():
-            for z in region["zones"]:
-                if z.lower() == zone_name.lower():
-                    zone_name = z
-                    zone_exists = True
-                    break
-            if zone_exists:
-                break
+    # Validate zone exists (exact or case-insensitive match)
+    zone_name = resolve_zone(args)
 
-    if not zone_exists:
+    if zone_name is None:
         await update.message.reply_text(
             f"Zone not found: {args}\n\nUse exact zone names (e.g., 'Tanjong Pagar', 'Bugis')."
         )
@@ -22,8 +22,8 @@ from config import (
     SIGHTING_EXPIRY_MINUTES,
 )
 
-from ..database import get_db
-from ..services.moderation import _check_auto_flag, ban_check
+from ..database import SightingIn, get_db
+from ..services.moderation import ban_check
 from ..services.notifications import broadcast_alert
 from ..ui.messages import build_alert_message
 from ..utils import (
@@ -316,17 +316,17 @@ async def handle_report_confirm(update: Update, context: ContextTypes.DEFAULT_TY
     sighting_id = generate_sighting_id()
 
     # Store sighting
-    sighting = {
-        "id": sighting_id,
-        "zone": zone_name,
-        "description": description,
-        "time": now,
-        "reporter_id": user_id,
-        "reporter_name": username,
-        "reporter_badge": badge,
-        "lat": lat,
-        "lng": lng,
-    }
+    sighting = SightingIn(
+        id=sighting_id,
+        zone=zone_name,
+        description=description,
+        time=now,
+        reporter_id=user_id,
+        reporter_name=username,
+        reporter_badge=badge,
+        lat=lat,
+        lng=lng,
+    )
     await db.add_sighting(sighting)
 
     # Build broadcast message from structured data
@@ -490,12 +490,6 @@ async def handle_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE, is
     except Exception as e:
         logger.error(f"Failed to update feedback message: {e}")
 
-    # Phase 9: Auto-flag sighting if negative feedback ratio is high
-    try:
-        await _check_auto_flag(sighting_id)
-    except Exception as e:
-        logger.error(f"Auto-flag check failed for {sighting_id}: {e}")
-
 
 @ban_check
 async def recent(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -17,9 +17,9 @@ from ..zones import ZONES
 logger = logging.getLogger(__name__)
 
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /start command — show quick-action menu."""
-    keyboard = [
+# /start quick-action menu — static, so built once at import
+_START_KEYBOARD = InlineKeyboardMarkup(
+    [
         [InlineKeyboardButton("\U0001f4cd Subscribe to Zones", callback_data="start_subscribe")],
         [InlineKeyboardButton("\U0001f6a8 Report a Sighting", callback_data="start_report")],
         [InlineKeyboardButton("\U0001f4cb Recent Sightings", callback_data="start_recent")],
@@ -27,12 +27,16 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton("\U0001f4ac Send Feedback", callback_data="start_feedback")],
         [InlineKeyboardButton("\u2753 Help", callback_data="start_help")],
     ]
+)
+
 
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /start command — show quick-action menu."""
     await update.message.reply_text(
         "Welcome to ParkWatch SG! \U0001f697\n\n"
         "I'll alert you when parking wardens are spotted nearby.\n\n"
         "What would you like to do?",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=_START_KEYBOARD,
     )
 
 
@@ -6,70 +6,161 @@ Kubernetes, etc.). Uses Python's built-in asyncio — no extra dependencies.
 
 import asyncio
 import contextlib
-import json
 import logging
+import socket
 from datetime import datetime, timezone
 
 from config import BOT_VERSION
 
+from .utils import json_dumps
+
 logger = logging.getLogger(__name__)
 
 _server: asyncio.AbstractServer | None = None
 
+# Writers of open connections, so stop_health_server can close idle keep-alive ones
+_connections: set[asyncio.StreamWriter] = set()
+
+# Idle keep-alive connections are closed after this many seconds without a request
+_IDLE_TIMEOUT = 5.0
+
+# Largest request head, and largest request body read and discarded to keep a connection open
+_MAX_HEAD = 8192
+_MAX_BODY = 65536
+
+
+def _response_head(status: bytes, connection: bytes) -> bytes:
+    """Status line and headers up to (but not including) the Content-Length value."""
+    return b"HTTP/1.1 %b\r\nContent-Type: application/json\r\nConnection: %b\r\nContent-Length: " % (status, connection)
+
+
+# Static response parts, built once and keyed by keep-alive. Only the /health timestamp varies per request.
+_HTTP_200_HEAD = {True: _response_head(b"200 OK", b"keep-alive"), False: _response_head(b"200 OK", b"close")}
+_NOT_FOUND_BODY = b'{"error":"not found"}'
+_HTTP_404 = {
+    keep_alive: _response_head(b"404 Not Found", connection) + b"%d\r\n\r\n%b" % (len(_NOT_FOUND_BODY), _NOT_FOUND_BODY)
+    for keep_alive, connection in ((True, b"keep-alive"), (False, b"close"))
+}
+
+
+def _parse_head(head: bytes) -> tuple[bool, int | None]:
+    """Read what the connection handling needs from a request head.
+
+    Returns (keep_alive, body_length). HTTP/1.1 defaults to keep-alive unless the
+    client sends "Connection: close"; HTTP/1.0 only keeps the connection when it
+    asks for "Connection: keep-alive". body_length is the Content-Length (0 when
+    absent), or None for a body that can't be skipped: chunked, malformed or
+    larger than _MAX_BODY.
+    """
+    lines = head.split(b"\r\n")
+    connection = b""
+    body_length: int | None = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"connection":
+            connection = value.strip().lower()
+        elif name == b"content-length":
+            body_length = int(value) if value.strip().isdigit() and int(value) <= _MAX_BODY else None
+        elif name == b"transfer-encoding":
+            body_length = None
+    if lines[0].endswith(b"HTTP/1.1"):
+        keep_alive = connection != b"close"
+    else:
+        keep_alive = connection == b"keep-alive"
+    return keep_alive, body_length
 
-async def start_health_server(port: int, run_mode: str = "polling") -> None:
-    """Start the health check HTTP server on the given port."""
-    global _server
+
+def make_request_handler(run_mode: str = "polling"):
+    """Build the /health connection handler for the given run mode.
+
+    The handler works on any asyncio StreamReader/StreamWriter pair, so it can be
+    driven without a listening TCP socket (e.g. over socket.socketpair() in tests).
+    Connections are kept alive between requests unless the client asks otherwise,
+    so pipelined requests are answered in order on the same stream. Request bodies
+    are skipped by Content-Length; a body that can't be skipped closes the connection.
+    """
+    # JSON body up to the opening quote of the timestamp value, e.g.
+    # {"status":"ok","version":"1.3.0","mode":"polling","timestamp":"
+    body_head = json_dumps({"status": "ok", "version": BOT_VERSION, "mode": run_mode})[:-1] + b',"timestamp":"'
 
     async def handle_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Each response goes out in a single write; make sure Nagle never holds it back.
+        # CPython's selector loop already does this, other event loops may not.
+        sock = writer.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            with contextlib.suppress(OSError):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        _connections.add(writer)
         try:
-            data = await asyncio.wait_for(reader.read(4096), timeout=5.0)
-            request_line = data.decode(errors="replace").split("\r\n")[0] if data else ""
-
-            if request_line.startswith("GET /health"):
-                body = json.dumps(
-                    {
-                        "status": "ok",
-                        "version": BOT_VERSION,
-                        "mode": run_mode,
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                    }
-                )
-                header = (
-                    "HTTP/1.1 200 OK\r\n"
-                    "Content-Type: application/json\r\n"
-                    f"Content-Length: {len(body)}\r\n"
-                    "Connection: close\r\n\r\n"
-                )
-            else:
-                body = json.dumps({"error": "not found"})
-                header = (
-                    "HTTP/1.1 404 Not Found\r\n"
-                    "Content-Type: application/json\r\n"
-                    f"Content-Length: {len(body)}\r\n"
-                    "Connection: close\r\n\r\n"
-                )
-
-            writer.write((header + body).encode())
-            await writer.drain()
-        except asyncio.TimeoutError:
+            buffer = b""
+            first = True
+            while True:
+                while b"\r\n\r\n" not in buffer:
+                    chunk = await asyncio.wait_for(reader.read(_MAX_HEAD), timeout=_IDLE_TIMEOUT)
+                    buffer += chunk
+                    if not chunk or first or len(buffer) > _MAX_HEAD:
+                        break
+                first = False
+                head, complete, buffer = buffer.partition(b"\r\n\r\n")
+                if not head:
+                    break  # client went away between requests
+
+                keep_alive, body_length = _parse_head(head) if complete else (False, 0)
+                if body_length is None:
+                    keep_alive = False  # can't find where the next request starts
+                elif body_length:
+                    # Skip the body so it isn't read as the next request
+                    if len(buffer) < body_length:
+                        buffer += await asyncio.wait_for(
+                            reader.readexactly(body_length - len(buffer)), timeout=_IDLE_TIMEOUT
+                        )
+                    buffer = buffer[body_length:]
+
+                # A head cut short (no blank line in the first read, or the client closed
+                # early) is still answered from its request line, then the connection closes
+                if head.startswith(b"GET /health"):
+                    body = body_head + datetime.now(timezone.utc).isoformat().encode() + b'"}'
+                    writer.write(_HTTP_200_HEAD[keep_alive] + b"%d\r\n\r\n" % len(body) + body)
+                else:
+                    writer.write(_HTTP_404[keep_alive])
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
             pass
         except Exception:
             logger.debug("Health check request handling error", exc_info=True)
         finally:
+            _connections.discard(writer)
             writer.close()
             with contextlib.suppress(Exception):
                 await writer.wait_closed()
 
-    _server = await asyncio.start_server(handle_request, "0.0.0.0", port)
-    logger.info("Health check server started on port %d (GET /health)", port)
+    return handle_request
+
+
+async def start_health_server(port: int, run_mode: str = "polling") -> int:
+    """Start the health check HTTP server on the given port.
+
+    Pass port=0 to bind an ephemeral port. Returns the port actually bound.
+    """
+    global _server
+
+    _server = await asyncio.start_server(make_request_handler(run_mode), "0.0.0.0", port)
+    bound_port: int = _server.sockets[0].getsockname()[1]
+    logger.info("Health check server started on port %d (GET /health)", bound_port)
+    return bound_port
 
 
 async def stop_health_server() -> None:
-    """Stop the health check HTTP server."""
+    """Stop the health check HTTP server, closing any idle keep-alive connections."""
     global _server
     if _server is not None:
         _server.close()
+        # wait_closed() waits for open connections on Python 3.12+; don't let idle ones hold it up
+        for writer in list(_connections):
+            writer.close()
         await _server.wait_closed()
         _server = None
         logger.info("Health check server stopped")
@@ -5,63 +5,186 @@ Supports two modes controlled by the LOG_FORMAT environment variable:
 - "json": Structured JSON format for log aggregation services (Datadog, ELK, CloudWatch, etc.)
 """
 
-import json
+import atexit
+import contextlib
 import logging
+import queue
 import sys
-from datetime import datetime, timezone
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from .utils import json_dumps
+
+# (whole second, "YYYY-MM-DDTHH:MM:SS") of the last formatted timestamp
+_ts_cache: tuple[int, str] = (-1, "")
+
+
+def _format_timestamp(record: logging.LogRecord) -> str:
+    """Render a record's creation time as ISO 8601 UTC with millisecond precision.
+
+    Avoids building a datetime per record; the date/time part is reused for all
+    records within the same second.
+    """
+    global _ts_cache
+    secs = int(record.created)
+    cached_secs, prefix = _ts_cache
+    if secs != cached_secs:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(secs))
+        _ts_cache = (secs, prefix)
+    return f"{prefix}.{int(record.msecs):03d}+00:00"
+
+
+# Pre-encoded '"level":...,"logger":...' JSON members per (logger name, level).
+# Bounded in practice by the number of loggers times the number of levels in use.
+_FRAGMENT_CACHE: dict[tuple[str, int], bytes] = {}
+
+# Attributes every LogRecord carries; anything else was passed via extra= and is emitted
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Keys JSONFormatter writes itself; an extra= field with one of these names is
+# emitted as extra_<name> so it can't shadow the real value with a duplicate key
+_OWN_KEYS = frozenset({"timestamp", "level", "logger", "message", "exception"})
 
 
 class JSONFormatter(logging.Formatter):
     """Format log records as single-line JSON objects.
 
     Output example:
-    {"timestamp":"2026-02-13T14:30:00.123456+00:00","level":"INFO","logger":"bot.main","message":"Bot starting..."}
+    {"timestamp":"2026-02-13T14:30:00.123+00:00","level":"INFO","logger":"bot.main","message":"Bot starting..."}
+
+    Fields passed via ``extra=`` (e.g. user_id, zone) are appended as top-level keys.
     """
 
     def format(self, record: logging.LogRecord) -> str:
-        log_entry: dict[str, object] = {
-            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
-            "level": record.levelname,
-            "logger": record.name,
-            "message": record.getMessage(),
-        }
+        return self.format_bytes(record).decode()
 
+    def format_bytes(self, record: logging.LogRecord) -> bytes:
+        """Format a record as UTF-8 encoded JSON, ready for a binary stream."""
+        key = (record.name, record.levelno)
+        fragment = _FRAGMENT_CACHE.get(key)
+        if fragment is None:
+            fragment = json_dumps({"level": record.levelname, "logger": record.name})[1:-1]
+            _FRAGMENT_CACHE[key] = fragment
+
+        extra = {f"extra_{k}" if k in _OWN_KEYS else k: v for k, v in record.__dict__.items() if k not in _RESERVED}
         if record.exc_info and record.exc_info[1] is not None:
-            log_entry["exception"] = self.formatException(record.exc_info)
+            # Cache the rendered traceback on the record, as logging.Formatter does,
+            # so other handlers formatting the same record don't render it again
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            extra["exception"] = record.exc_text
+
+        out = b'{"timestamp":"%b",%b,"message":%b' % (
+            _format_timestamp(record).encode(),
+            fragment,
+            json_dumps(record.getMessage()),
+        )
+        if extra:
+            out += b"," + json_dumps(extra)[1:-1]
+        return out + b"}"
+
+
+class BytesStreamHandler(logging.StreamHandler):
+    """StreamHandler that writes to the binary layer of a text stream such as sys.stdout.
+
+    JSON records are written as the bytes JSONFormatter produces, skipping the
+    str round trip and the text layer's re-encode. Other formatters are encoded
+    as UTF-8. Anything still pending in the text layer (e.g. print() output) is
+    flushed first so lines come out in the order they were written.
+    """
 
-        if hasattr(record, "user_id"):
-            log_entry["user_id"] = record.user_id  # type: ignore[attr-defined]
-        if hasattr(record, "zone"):
-            log_entry["zone"] = record.zone  # type: ignore[attr-defined]
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if isinstance(self.formatter, JSONFormatter):
+                data = self.formatter.format_bytes(record) + b"\n"
+            else:
+                data = (self.format(record) + self.terminator).encode()
+            self.stream.flush()
+            self.stream.buffer.write(data)
+            self.stream.buffer.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """QueueHandler feeding a QueueListener in the same process.
+
+    The stock prepare() pre-formats the record and strips exc_info so it can be
+    pickled; here the record never leaves the process, so only the message is
+    frozen and the downstream formatter still sees exc_info and extra fields.
+    """
 
-        return json.dumps(log_entry, default=str)
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Drains the root logger's queue into the real stream handler on a background thread
+_listener: QueueListener | None = None
+
+
+def _stop_listener() -> None:
+    """Stop the queue listener, writing out any records still queued."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            # Same tolerance as logging.shutdown(): the stream may already be closed
+            with contextlib.suppress(OSError, ValueError):
+                handler.close()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+# Third-party loggers capped at a quieter level by setup_logging
+_NOISY_LOGGERS = (
+    ("httpx", logging.WARNING),
+    ("httpcore", logging.WARNING),
+    ("telegram.ext", logging.WARNING),
+)
 
 
 def setup_logging(log_format: str = "text", level: int = logging.INFO) -> None:
     """Configure the root logger based on the desired format.
 
+    Callers only enqueue records; a QueueListener thread formats them and does
+    the stream I/O, so logging never blocks the event loop on write().
+
     Args:
         log_format: "text" for human-readable, "json" for structured JSON.
         level: Logging level (default: INFO).
     """
+    global _listener
     root_logger = logging.getLogger()
 
     # Remove any existing handlers to avoid duplicate output
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
-
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(level)
+    _stop_listener()
+    for old_handler in root_logger.handlers[:]:
+        root_logger.removeHandler(old_handler)
 
+    # The listener thread is the only buffering layer: handlers write and flush each record
+    handler: logging.StreamHandler
     if log_format == "json":
+        # Write JSON straight to the binary layer when stdout has one (not e.g. a StringIO)
+        handler = BytesStreamHandler(sys.stdout) if hasattr(sys.stdout, "buffer") else logging.StreamHandler(sys.stdout)
         handler.setFormatter(JSONFormatter())
     else:
+        handler = logging.StreamHandler(sys.stdout)
         handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    handler.setLevel(level)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
 
     root_logger.setLevel(level)
-    root_logger.addHandler(handler)
+    root_logger.addHandler(_InProcessQueueHandler(log_queue))
 
     # Suppress noisy third-party loggers
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("httpcore").setLevel(logging.WARNING)
-    logging.getLogger("telegram.ext").setLevel(logging.WARNING)
+    for name, noisy_level in _NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(noisy_level)
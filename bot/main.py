@@ -29,7 +29,13 @@ from config import (
 from .database import close_db, get_db, init_db
 
 # Backward-compatible re-exports (tests import these from bot.main)
-from .handlers.admin import ADMIN_COMMANDS_DETAILED, ADMIN_COMMANDS_HELP, admin_command, admin_only  # noqa: F401
+from .handlers.admin import (  # noqa: F401
+    ADMIN_COMMAND_NAMES,
+    ADMIN_COMMANDS_DETAILED,
+    ADMIN_COMMANDS_HELP,
+    admin_command,
+    admin_only,
+)
 from .handlers.report import (
     AWAITING_DESCRIPTION,
     AWAITING_LOCATION,
@@ -80,7 +86,7 @@ from .utils import (  # noqa: F401
     haversine_meters,
     sanitize_description,
 )
-from .zones import ZONE_COORDS, ZONES  # noqa: F401
+from .zones import ALL_ZONES, ZONE_CI_MAP, ZONE_COORDS, ZONES, resolve_zone  # noqa: F401
 
 # Set up structured logging (must happen before any logger usage)
 setup_logging(log_format=LOG_FORMAT)
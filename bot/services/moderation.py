@@ -5,7 +5,7 @@ import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from ..database import get_db
+from ..database import Database, get_db
 
 logger = logging.getLogger(__name__)
 
@@ -29,20 +29,12 @@ def ban_check(func):
     return wrapper
 
 
-async def _check_auto_flag(sighting_id: str) -> None:
+async def _check_auto_flag(sighting_id: str, db: Database | None = None) -> None:
     """Check if a sighting should be auto-flagged after feedback update.
 
-    Flags when negative feedback ratio exceeds 70% with at least 3 votes.
+    Flags when negative feedback ratio exceeds 70% with at least 3 votes. Kept for
+    backward-compatible imports; the feedback write paths auto-flag themselves.
+    Uses the global database unless db is given.
     """
-    db = get_db()
-    sighting = await db.get_sighting(sighting_id)
-    if not sighting:
-        return
-
-    pos = sighting.get("feedback_positive", 0)
-    neg = sighting.get("feedback_negative", 0)
-    total = pos + neg
-
-    if total >= 3 and neg / total > 0.7:
-        await db.flag_sighting(sighting_id)
-        logger.info(f"Auto-flagged sighting {sighting_id}: {neg}/{total} negative feedback")
+    if await (db or get_db()).auto_flag_sighting(sighting_id):
+        logger.info(f"Auto-flagged sighting {sighting_id} after negative feedback")
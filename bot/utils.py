@@ -1,10 +1,16 @@
 """Pure utility functions for ParkWatch SG."""
 
+import json
 import math
 import re
 import uuid
 from datetime import timedelta, timezone
 
+try:
+    import orjson
+except ImportError:  # optional speedup (pip install ".[speedups]")
+    orjson = None  # type: ignore[assignment]
+
 # Singapore Time (UTC+8)
 SGT = timezone(timedelta(hours=8))
 
@@ -65,5 +71,22 @@ def sanitize_description(text):
     # Collapse multiple whitespace into single space
     text = re.sub(r"\s+", " ", text)
     text = text.strip()
-    text = text[:100]
+    text = text[:100].rstrip()  # the cut can land just after a space
     return text if text else None
+
+
+def json_dumps(obj) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes; unsupported values are str()-ed.
+
+    Uses orjson when installed, otherwise the stdlib encoder. Strings with lone
+    surrogates can't be encoded as UTF-8, so those are written \\u-escaped.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits or lone surrogates — let the stdlib encoder handle it
+    try:
+        return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":")).encode()
+    except UnicodeEncodeError:
+        return json.dumps(obj, default=str, separators=(",", ":")).encode()
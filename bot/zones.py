@@ -105,6 +105,15 @@ ZONES = {
     },
 }
 
+# Flat lookups over ZONES, built once at import
+ALL_ZONES = frozenset(z for region in ZONES.values() for z in region["zones"])
+ZONE_CI_MAP = {z.lower(): z for z in ALL_ZONES}  # lowercased name → canonical name
+
+
+def resolve_zone(name: str) -> str | None:
+    """Return the canonical zone name for name (case-insensitive), or None if unknown."""
+    return name if name in ALL_ZONES else ZONE_CI_MAP.get(name.lower())
+
 
 # Zone center coordinates (lat, lng) — used for GPS → nearest zone detection
 ZONE_COORDS = {
@@ -35,19 +35,22 @@ SENTRY_DSN = os.getenv("SENTRY_DSN")
 
 # --- Phase 8: Admin Foundation ---
 
+
+def _parse_admin_ids(raw: str) -> set[int]:
+    """Parse a comma-separated list of Telegram user IDs, ignoring blank and non-numeric entries."""
+    return {int(part) for raw_part in raw.split(",") if (part := raw_part.strip()).isdigit()}
+
+
 # Admin authentication: comma-separated Telegram user IDs authorized as admins
-ADMIN_USER_IDS: set[int] = set()
-_admin_ids_raw = os.getenv("ADMIN_USER_IDS", "")
-if _admin_ids_raw.strip():
-    for _id in _admin_ids_raw.split(","):
-        _id = _id.strip()
-        if _id.isdigit():
-            ADMIN_USER_IDS.add(int(_id))
+ADMIN_USER_IDS: set[int] = _parse_admin_ids(os.getenv("ADMIN_USER_IDS", ""))
 
 # --- Phase 9: User Management & Content Moderation ---
 
 # Maximum warnings before auto-ban (0 = disable auto-ban escalation)
 MAX_WARNINGS = int(os.getenv("MAX_WARNINGS", "3"))
 
+# Seconds a user's ban status stays cached in-process (bans applied by another process show up within this window)
+BAN_CHECK_TTL = int(os.getenv("BAN_CHECK_TTL", "60"))
+
 # Bot version (for health check and Sentry release tracking)
 BOT_VERSION = "1.3.0"
@@ -1,7 +1,14 @@
 """Shared fixtures for ParkWatch SG tests."""
 
+import asyncio
 import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
 
+import pytest
 import pytest_asyncio
 
 # Ensure tests never use a real bot token or production DB
@@ -9,15 +16,68 @@ os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token-not-real")
 os.environ.pop("DATABASE_URL", None)
 os.environ.pop("DATABASE_PRIVATE_URL", None)
 
+# The default Proactor loop on Windows is slower for the many small socket round trips
+# in the health server tests; they only need stream sockets, which the selector loop handles
+if sys.platform == "win32":
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
 from bot.database import Database
 
+# Tables emptied between tests, children before parents
+_TABLES = ("feedback", "sightings", "subscriptions", "admin_actions", "banned_users", "users")
 
-@pytest_asyncio.fixture
-async def db(tmp_path):
-    """Provide a fresh SQLite database for each test."""
-    db_path = str(tmp_path / "test_parkwatch.db")
-    database = Database(f"sqlite:///{db_path}")
+
+@dataclass(slots=True)
+class FakeUpdate:
+    """The two Update attributes the admin_only/ban_check decorators touch, without a MagicMock tree."""
+
+    effective_user: SimpleNamespace
+    message: SimpleNamespace
+
+
+@pytest.fixture
+def fake_update():
+    """Factory for FakeUpdate objects from a Telegram user id."""
+
+    def make(user_id: int) -> FakeUpdate:
+        return FakeUpdate(SimpleNamespace(id=user_id), SimpleNamespace(reply_text=AsyncMock()))
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def fixed_now():
+    """A pinned "current time" for tests of time-windowed queries, so they can't straddle a window edge."""
+    return datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def _session_db():
+    """Open one in-memory SQLite database and create its schema once for the whole test session.
+
+    Under pytest-xdist (``pytest -n auto``) every worker is its own process with
+    its own in-memory database, so workers never share state.
+    """
+    database = Database("sqlite:///:memory:")
     await database.connect()
     await database.create_tables()
     yield database
     await database.close()
+
+
+@pytest_asyncio.fixture
+async def db(_session_db):
+    """Provide an empty SQLite database for each test.
+
+    The connection and schema are shared across the session; rows written by a
+    test are deleted afterwards instead of rebuilding the database.
+    """
+    yield _session_db
+    await _session_db.flush_audit()  # don't let queued audit entries leak into the next test
+    conn = _session_db._conn
+    for table in _TABLES:
+        await conn.execute(f"DELETE FROM {table}")
+    await conn.execute("DELETE FROM sqlite_sequence")  # restart AUTOINCREMENT ids
+    await conn.commit()
+    _session_db._banned_ids = None
+    _session_db._invalidate_stats()
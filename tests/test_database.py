@@ -9,7 +9,7 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from bot.database import Database
+from bot.database import Database, SightingIn
 
 
 # ---------------------------------------------------------------------------
@@ -140,7 +140,7 @@ class TestSightings:
             "lng": 103.8553,
         }
         base.update(overrides)
-        return base
+        return SightingIn(**base)
 
     @pytest.mark.asyncio
     async def test_add_and_get_sighting(self, db):
@@ -175,6 +175,17 @@ class TestSightings:
         await db.add_sighting(self._make_sighting("s2", zone="Orchard"))
         assert await db.get_total_sightings_count() == 2
 
+    @pytest.mark.asyncio
+    async def test_add_sightings_bulk(self, db):
+        await db.add_sightings_bulk([self._make_sighting("s1"), self._make_sighting("s2", zone="Orchard")])
+        assert await db.get_total_sightings_count() == 2
+        assert (await db.get_sighting("s2"))["zone"] == "Orchard"
+
+    @pytest.mark.asyncio
+    async def test_add_sightings_bulk_empty(self, db):
+        await db.add_sightings_bulk([])
+        assert await db.get_total_sightings_count() == 0
+
 
 # ---------------------------------------------------------------------------
 # Recent sightings & duplicate detection
@@ -196,7 +207,7 @@ class TestRecentSightings:
             "lng": 103.8553,
         }
         base.update(overrides)
-        return base
+        return SightingIn(**base)
 
     @pytest.mark.asyncio
     async def test_find_recent_zone_sightings_within_window(self, db):
@@ -256,17 +267,15 @@ class TestRateLimiting:
 
     @staticmethod
     def _make_sighting(sighting_id, minutes_ago=0, reporter_id=100):
-        return {
-            "id": sighting_id,
-            "zone": "Bugis",
-            "description": "test",
-            "time": datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
-            "reporter_id": reporter_id,
-            "reporter_name": "alice",
-            "reporter_badge": "🆕 New",
-            "lat": None,
-            "lng": None,
-        }
+        return SightingIn(
+            id=sighting_id,
+            zone="Bugis",
+            description="test",
+            time=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+            reporter_id=reporter_id,
+            reporter_name="alice",
+            reporter_badge="🆕 New",
+        )
 
     @pytest.mark.asyncio
     async def test_count_reports_since(self, db):
@@ -316,17 +325,17 @@ class TestFeedback:
 
     @staticmethod
     def _make_sighting(sighting_id="s1", reporter_id=100):
-        return {
-            "id": sighting_id,
-            "zone": "Bugis",
-            "description": "test",
-            "time": datetime.now(timezone.utc),
-            "reporter_id": reporter_id,
-            "reporter_name": "alice",
-            "reporter_badge": "🆕 New",
-            "lat": 1.3008,
-            "lng": 103.8553,
-        }
+        return SightingIn(
+            id=sighting_id,
+            zone="Bugis",
+            description="test",
+            time=datetime.now(timezone.utc),
+            reporter_id=reporter_id,
+            reporter_name="alice",
+            reporter_badge="🆕 New",
+            lat=1.3008,
+            lng=103.8553,
+        )
 
     @pytest.mark.asyncio
     async def test_apply_feedback_positive(self, db):
@@ -371,6 +380,16 @@ class TestFeedback:
         assert sighting["feedback_positive"] == 2
         assert sighting["feedback_negative"] == 1
 
+    @pytest.mark.asyncio
+    async def test_apply_feedback_auto_flags_past_threshold(self, db):
+        """The vote that takes a sighting past 70% negative (3+ votes) should flag it."""
+        await db.add_sighting(self._make_sighting())
+        await db.apply_feedback("s1", 200, "negative")
+        result = await db.apply_feedback("s1", 300, "negative")
+        assert result["flagged"] == 0  # only 2 votes
+        result = await db.apply_feedback("s1", 400, "negative")
+        assert result["flagged"] == 1
+
     @pytest.mark.asyncio
     async def test_apply_feedback_nonexistent_sighting(self, db):
         # With FK constraints, inserting feedback for non-existent sighting should fail.
@@ -408,17 +427,15 @@ class TestAccuracy:
 
     @staticmethod
     def _make_sighting(sighting_id, reporter_id=100, pos=0, neg=0):
-        return {
-            "id": sighting_id,
-            "zone": "Bugis",
-            "description": "test",
-            "time": datetime.now(timezone.utc),
-            "reporter_id": reporter_id,
-            "reporter_name": "alice",
-            "reporter_badge": "🆕 New",
-            "lat": None,
-            "lng": None,
-        }
+        return SightingIn(
+            id=sighting_id,
+            zone="Bugis",
+            description="test",
+            time=datetime.now(timezone.utc),
+            reporter_id=reporter_id,
+            reporter_name="alice",
+            reporter_badge="🆕 New",
+        )
 
     @pytest.mark.asyncio
     async def test_accuracy_no_sightings(self, db):
@@ -487,17 +504,15 @@ class TestCleanup:
 
     @staticmethod
     def _make_sighting(sighting_id, days_ago=0):
-        return {
-            "id": sighting_id,
-            "zone": "Bugis",
-            "description": "test",
-            "time": datetime.now(timezone.utc) - timedelta(days=days_ago),
-            "reporter_id": 100,
-            "reporter_name": "alice",
-            "reporter_badge": "🆕 New",
-            "lat": None,
-            "lng": None,
-        }
+        return SightingIn(
+            id=sighting_id,
+            zone="Bugis",
+            description="test",
+            time=datetime.now(timezone.utc) - timedelta(days=days_ago),
+            reporter_id=100,
+            reporter_name="alice",
+            reporter_badge="🆕 New",
+        )
 
     @pytest.mark.asyncio
     async def test_cleanup_removes_old_sightings(self, db):
@@ -538,17 +553,15 @@ class TestFeedbackCounts:
 
     @staticmethod
     def _make_sighting(sighting_id="s1"):
-        return {
-            "id": sighting_id,
-            "zone": "Bugis",
-            "description": "test",
-            "time": datetime.now(timezone.utc),
-            "reporter_id": 100,
-            "reporter_name": "alice",
-            "reporter_badge": "🆕 New",
-            "lat": None,
-            "lng": None,
-        }
+        return SightingIn(
+            id=sighting_id,
+            zone="Bugis",
+            description="test",
+            time=datetime.now(timezone.utc),
+            reporter_id=100,
+            reporter_name="alice",
+            reporter_badge="🆕 New",
+        )
 
     @pytest.mark.asyncio
     async def test_update_feedback_counts(self, db):
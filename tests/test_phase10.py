@@ -9,6 +9,7 @@ from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from telegram.error import Forbidden
 
 
 # ---------------------------------------------------------------------------
@@ -279,12 +280,12 @@ class TestGetAllUserIds:
 
     @pytest.mark.asyncio
     async def test_returns_all_user_ids(self, db):
-        """Should return all registered user IDs."""
+        """Should return all registered user IDs in ascending order."""
+        await db.ensure_user(300, "charlie")
         await db.ensure_user(100, "alice")
         await db.ensure_user(200, "bob")
-        await db.ensure_user(300, "charlie")
         ids = await db.get_all_user_ids()
-        assert set(ids) == {100, 200, 300}
+        assert ids == [100, 200, 300]
 
 
 # ---------------------------------------------------------------------------
@@ -311,7 +312,7 @@ class TestAdminAnnounce:
         mock.clear_subscriptions = AsyncMock()
         return mock
 
-    def _run(self, update, context, mock_db, admin_ids=None):
+    async def _run(self, update, context, mock_db, admin_ids=None):
         """Run admin_command with mock DB and admin auth."""
         from bot.handlers.admin import admin_command
 
@@ -321,28 +322,34 @@ class TestAdminAnnounce:
             patch("bot.handlers.admin.ADMIN_USER_IDS", admin_ids),
             patch("bot.handlers.admin.get_db", return_value=mock_db),
         ):
-            asyncio.get_event_loop().run_until_complete(admin_command(update, context))
+            await admin_command(update, context)
 
-    def test_announce_no_args_shows_usage(self):
-        """Should show usage when no arguments provided."""
-        update = self._make_update(text="/admin announce")
+    @pytest.mark.parametrize(
+        "text",
+        ["/admin announce", "/admin announce all", "/admin announce zone"],
+    )
+    @pytest.mark.asyncio
+    async def test_announce_missing_message_shows_usage(self, text):
+        """Should show usage when the scope or message is missing."""
+        update = self._make_update(text=text)
         context = MagicMock()
         context.user_data = {}
         mock_db = self._mock_db()
 
-        self._run(update, context, mock_db)
+        await self._run(update, context, mock_db)
 
         reply_text = update.message.reply_text.call_args[0][0]
         assert "Usage" in reply_text
 
-    def test_announce_all_shows_preview(self):
+    @pytest.mark.asyncio
+    async def test_announce_all_shows_preview(self):
         """Should show preview with recipient count for 'all' scope."""
         update = self._make_update(text="/admin announce all Hello everyone!")
         context = MagicMock()
         context.user_data = {}
         mock_db = self._mock_db(user_ids=[100, 200, 300])
 
-        self._run(update, context, mock_db)
+        await self._run(update, context, mock_db)
 
         reply_text = update.message.reply_text.call_args[0][0]
         assert "Preview" in reply_text
@@ -350,14 +357,15 @@ class TestAdminAnnounce:
         assert "Hello everyone!" in reply_text
         assert "confirm" in reply_text.lower()
 
-    def test_announce_all_stores_pending(self):
+    @pytest.mark.asyncio
+    async def test_announce_all_stores_pending(self):
         """Should store pending announcement in context.user_data."""
         update = self._make_update(text="/admin announce all Test message")
         context = MagicMock()
         context.user_data = {}
         mock_db = self._mock_db(user_ids=[100, 200])
 
-        self._run(update, context, mock_db)
+        await self._run(update, context, mock_db)
 
         pending = context.user_data.get("pending_announce")
         assert pending is not None
@@ -365,156 +373,90 @@ class TestAdminAnnounce:
         assert pending["recipients"] == [100, 200]
         assert "Test message" in pending["message"]
 
-    def test_announce_zone_shows_preview(self):
+    @pytest.mark.asyncio
+    async def test_announce_zone_shows_preview(self):
         """Should show preview for zone-scoped announcement."""
         update = self._make_update(text="/admin announce zone Bugis Watch out for roadworks")
         context = MagicMock()
         context.user_data = {}
         mock_db = self._mock_db(zone_subscribers=[100, 200])
 
-        self._run(update, context, mock_db)
+        await self._run(update, context, mock_db)
 
         reply_text = update.message.reply_text.call_args[0][0]
         assert "Preview" in reply_text
         assert "Bugis" in reply_text
         assert "Watch out for roadworks" in reply_text
 
-    def test_announce_zone_invalid_zone(self):
+    @pytest.mark.asyncio
+    async def test_announce_zone_invalid_zone(self):
         """Should reject announcements to non-existent zones."""
         update = self._make_update(text="/admin announce zone NonExistentZone Hello")
         context = MagicMock()
         context.user_data = {}
         mock_db = self._mock_db()
 
-        self._run(update, context, mock_db)
+        await self._run(update, context, mock_db)
 
         reply_text = update.message.reply_text.call_args[0][0]
         assert "Could not parse" in reply_text or "not found" in reply_text.lower()
 
-    def test_announce_confirm_sends_messages(self):
-        """Should send messages to all recipients on confirm."""
+    @pytest.mark.parametrize(
+        "recipients, send_side_effect, expected, blocked",
+        [
+            pytest.param([100, 200, 300], None, ["Sent: 3"], [], id="all-delivered"),
+            pytest.param(
+                [100, 200],
+                [None, Forbidden("Forbidden: bot was blocked by the user")],
+                ["Sent: 1", "Failed: 1", "Blocked"],
+                [200],
+                id="blocked-user",
+            ),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_announce_confirm(self, recipients, send_side_effect, expected, blocked):
+        """Confirm should send, report results, clean up blocked users, log, and clear pending."""
         update = self._make_update(text="/admin announce confirm")
         context = MagicMock()
         context.user_data = {
             "pending_announce": {
                 "message": "Test broadcast",
-                "recipients": [100, 200, 300],
+                "recipients": recipients,
                 "scope": "all users",
                 "raw_text": "Test broadcast",
             }
         }
-        context.bot.send_message = AsyncMock()
+        context.bot.send_message = AsyncMock(side_effect=send_side_effect)
         mock_db = self._mock_db()
 
-        self._run(update, context, mock_db)
+        await self._run(update, context, mock_db)
 
-        assert context.bot.send_message.call_count == 3
+        assert context.bot.send_message.call_count == len(recipients)
         reply_text = update.message.reply_text.call_args[0][0]
-        assert "Sent: 3" in reply_text
-
-    def test_announce_confirm_no_pending(self):
-        """Should show error when no pending announcement."""
-        update = self._make_update(text="/admin announce confirm")
-        context = MagicMock()
-        context.user_data = {}
-        mock_db = self._mock_db()
-
-        self._run(update, context, mock_db)
-
-        reply_text = update.message.reply_text.call_args[0][0]
-        assert "No pending" in reply_text
-
-    def test_announce_confirm_handles_blocked_users(self):
-        """Should handle Forbidden errors and clean up blocked users."""
-        from telegram.error import Forbidden as TgForbidden
-
-        update = self._make_update(text="/admin announce confirm")
-        context = MagicMock()
-        context.user_data = {
-            "pending_announce": {
-                "message": "Test",
-                "recipients": [100, 200],
-                "scope": "all users",
-                "raw_text": "Test",
-            }
-        }
-
-        # First send succeeds, second raises Forbidden
-        context.bot.send_message = AsyncMock(side_effect=[None, TgForbidden("Forbidden: bot was blocked by the user")])
-        mock_db = self._mock_db()
-
-        self._run(update, context, mock_db)
-
-        reply_text = update.message.reply_text.call_args[0][0]
-        assert "Sent: 1" in reply_text
-        assert "Failed: 1" in reply_text
-        assert "Blocked" in reply_text
-        mock_db.clear_subscriptions.assert_called_once_with(200)
-
-    def test_announce_confirm_logs_action(self):
-        """Should log the announcement to audit trail."""
-        update = self._make_update(text="/admin announce confirm")
-        context = MagicMock()
-        context.user_data = {
-            "pending_announce": {
-                "message": "Hello world",
-                "recipients": [100],
-                "scope": "all users",
-                "raw_text": "Hello world",
-            }
-        }
-        context.bot.send_message = AsyncMock()
-        mock_db = self._mock_db()
-
-        self._run(update, context, mock_db)
+        for fragment in expected:
+            assert fragment in reply_text
+        assert [c.args[0] for c in mock_db.clear_subscriptions.call_args_list] == blocked
 
         mock_db.log_admin_action.assert_called_once()
         call_args = mock_db.log_admin_action.call_args
         assert call_args[0][1] == "announce"
         assert "all users" in call_args[1]["target"]
 
-    def test_announce_confirm_clears_pending(self):
-        """Should clear pending announcement after sending."""
-        update = self._make_update(text="/admin announce confirm")
-        context = MagicMock()
-        context.user_data = {
-            "pending_announce": {
-                "message": "Test",
-                "recipients": [100],
-                "scope": "all users",
-                "raw_text": "Test",
-            }
-        }
-        context.bot.send_message = AsyncMock()
-        mock_db = self._mock_db()
-
-        self._run(update, context, mock_db)
-
         assert "pending_announce" not in context.user_data
 
-    def test_announce_all_no_message(self):
-        """Should show usage when 'all' has no message."""
-        update = self._make_update(text="/admin announce all")
-        context = MagicMock()
-        context.user_data = {}
-        mock_db = self._mock_db()
-
-        self._run(update, context, mock_db)
-
-        reply_text = update.message.reply_text.call_args[0][0]
-        assert "Usage" in reply_text
-
-    def test_announce_zone_no_message(self):
-        """Should show usage when 'zone' has no message."""
-        update = self._make_update(text="/admin announce zone")
+    @pytest.mark.asyncio
+    async def test_announce_confirm_no_pending(self):
+        """Should show error when no pending announcement."""
+        update = self._make_update(text="/admin announce confirm")
         context = MagicMock()
         context.user_data = {}
         mock_db = self._mock_db()
 
-        self._run(update, context, mock_db)
+        await self._run(update, context, mock_db)
 
         reply_text = update.message.reply_text.call_args[0][0]
-        assert "Usage" in reply_text
+        assert "No pending" in reply_text
 
 
 # ---------------------------------------------------------------------------
@@ -525,10 +467,9 @@ class TestAdminHelpIncludesAnnounce:
 
     def test_admin_help_has_announce(self):
         """ADMIN_COMMANDS_HELP should include announce."""
-        from bot.handlers.admin import ADMIN_COMMANDS_HELP
+        from bot.handlers.admin import ADMIN_COMMAND_NAMES
 
-        help_text = " ".join(ADMIN_COMMANDS_HELP.keys())
-        assert "announce" in help_text
+        assert "announce" in ADMIN_COMMAND_NAMES
 
     def test_admin_detailed_has_announce(self):
         """ADMIN_COMMANDS_DETAILED should include announce."""
@@ -589,47 +530,31 @@ class TestStartMenu:
         callback_datas = [btn.callback_data for row in reply_markup.inline_keyboard for btn in row]
         assert any(d.startswith("region_") for d in callback_datas)
 
-    def test_start_menu_report_callback(self):
-        """Clicking 'Report a Sighting' should show report instructions."""
-        from bot.handlers.user import handle_start_menu
-
-        update = MagicMock()
-        update.callback_query.data = "start_report"
-        update.callback_query.answer = AsyncMock()
-        update.callback_query.edit_message_text = AsyncMock()
-
-        asyncio.get_event_loop().run_until_complete(handle_start_menu(update, MagicMock()))
-
-        text = update.callback_query.edit_message_text.call_args[0][0]
-        assert "/report" in text
-
-    def test_start_menu_feedback_callback(self):
-        """Clicking 'Send Feedback' should show feedback instructions."""
-        from bot.handlers.user import handle_start_menu
-
-        update = MagicMock()
-        update.callback_query.data = "start_feedback"
-        update.callback_query.answer = AsyncMock()
-        update.callback_query.edit_message_text = AsyncMock()
-
-        asyncio.get_event_loop().run_until_complete(handle_start_menu(update, MagicMock()))
-
-        text = update.callback_query.edit_message_text.call_args[0][0]
-        assert "/feedback" in text
-
-    def test_start_menu_help_callback(self):
-        """Clicking 'Help' should show help instructions."""
+    @pytest.mark.parametrize(
+        "callback_data, expected",
+        [
+            ("start_report", "/report"),
+            ("start_recent", "/recent"),
+            ("start_mystats", "/mystats"),
+            ("start_feedback", "/feedback"),
+            ("start_help", "/help"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_start_menu_text_callbacks(self, callback_data, expected):
+        """Text-only quick actions should point the user at the matching command."""
         from bot.handlers.user import handle_start_menu
 
         update = MagicMock()
-        update.callback_query.data = "start_help"
+        update.callback_query.data = callback_data
         update.callback_query.answer = AsyncMock()
         update.callback_query.edit_message_text = AsyncMock()
 
-        asyncio.get_event_loop().run_until_complete(handle_start_menu(update, MagicMock()))
+        await handle_start_menu(update, MagicMock())
 
+        update.callback_query.answer.assert_called_once()
         text = update.callback_query.edit_message_text.call_args[0][0]
-        assert "/help" in text
+        assert expected in text
 
 
 class TestPostActionPrompts:
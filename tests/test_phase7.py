@@ -4,94 +4,237 @@ Tests for health check server, structured logging, and config additions.
 """
 
 import asyncio
+import io
 import json
 import logging
+import re
+import socket
+import sys
 from datetime import datetime
+from logging.handlers import QueueHandler
 from unittest.mock import patch
 
 import pytest
+import pytest_asyncio
 
-from bot.health import start_health_server, stop_health_server
-from bot.logging_config import JSONFormatter, setup_logging
-from config import BOT_VERSION
+from bot import logging_config
+from bot import main as bot_main
+from bot.health import make_request_handler, start_health_server, stop_health_server
+from bot.logging_config import BytesStreamHandler, JSONFormatter, setup_logging
+from config import BOT_VERSION, HEALTH_CHECK_ENABLED, LOG_FORMAT, PORT, SENTRY_DSN, WEBHOOK_URL
 
 
 # ---------------------------------------------------------------------------
 # Health Check Server
 # ---------------------------------------------------------------------------
-class TestHealthCheckServer:
-    """Tests for the lightweight asyncio health check HTTP server."""
+async def _local_pipe():
+    """Return connected (client, server) stream pairs over socket.socketpair() — no TCP stack."""
+    client_sock, server_sock = socket.socketpair()
+    client = await asyncio.open_connection(sock=client_sock)
+    server = await asyncio.open_connection(sock=server_sock)
+    return client, server
 
-    @pytest.fixture(autouse=True)
-    async def _cleanup_server(self):
-        """Ensure the health check server is stopped after each test."""
-        yield
-        await stop_health_server()
 
-    @pytest.mark.asyncio
+async def _open_handler(run_mode: str):
+    """Start the health request handler on an in-process pipe; returns (reader, writer, handler task)."""
+    (reader, writer), (srv_reader, srv_writer) = await _local_pipe()
+    handled = asyncio.create_task(make_request_handler(run_mode)(srv_reader, srv_writer))
+    return reader, writer, handled
+
+
+async def _handler_get(run_mode: str, path: str) -> bytes:
+    """Drive the health request handler directly over an in-process pipe."""
+    reader, writer, handled = await _open_handler(run_mode)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(4096), timeout=5.0)
+    await handled
+    writer.close()
+    return response
+
+
+async def _http_get(port: int, path: str) -> bytes:
+    """Send a GET request to the local health server and return the raw response."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(4096), timeout=5.0)
+    writer.close()
+    return response
+
+
+async def _read_response(reader: asyncio.StreamReader) -> bytes:
+    """Read exactly one Content-Length framed HTTP response from a kept-alive stream."""
+    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5.0)
+    length = int(head.split(b"Content-Length: ", 1)[1].split(b"\r\n", 1)[0])
+    return head + await asyncio.wait_for(reader.readexactly(length), timeout=5.0)
+
+
+def _json_body(response: bytes) -> dict:
+    """Parse the JSON body that follows the blank line ending the response headers."""
+    sep = response.find(b"\r\n\r\n")
+    assert sep != -1
+    return json.loads(response[sep + 4 :])
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="class")
+async def polling_port():
+    """Run one polling-mode health server per test class; yields its ephemeral port."""
+    port = await start_health_server(port=0, run_mode="polling")
+    yield port
+    await stop_health_server()
+
+
+@pytest.mark.asyncio(loop_scope="class")
+class TestHealthRequestHandler:
+    """Protocol tests for the /health handler, driven over an in-process socket pair."""
+
     async def test_health_endpoint_returns_200(self):
         """GET /health should return 200 with JSON body."""
-        await start_health_server(port=18080, run_mode="polling")
-        reader, writer = await asyncio.open_connection("127.0.0.1", 18080)
-        writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
-        await writer.drain()
-        response = await asyncio.wait_for(reader.read(4096), timeout=5.0)
-        writer.close()
-        response_str = response.decode()
-        assert "200 OK" in response_str
-        # Parse the JSON body (after the empty line separating headers from body)
-        body = response_str.split("\r\n\r\n", 1)[1]
-        data = json.loads(body)
+        response = await _handler_get("polling", "/health")
+        assert b"200 OK" in response
+        data = _json_body(response)
         assert data["status"] == "ok"
         assert data["version"] == BOT_VERSION
         assert data["mode"] == "polling"
         assert "timestamp" in data
 
-    @pytest.mark.asyncio
     async def test_health_endpoint_webhook_mode(self):
         """Health check should report webhook mode when configured."""
-        await start_health_server(port=18081, run_mode="webhook")
-        reader, writer = await asyncio.open_connection("127.0.0.1", 18081)
-        writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
-        await writer.drain()
-        response = await asyncio.wait_for(reader.read(4096), timeout=5.0)
-        writer.close()
-        body = response.decode().split("\r\n\r\n", 1)[1]
-        data = json.loads(body)
+        response = await _handler_get("webhook", "/health")
+        data = _json_body(response)
         assert data["mode"] == "webhook"
 
-    @pytest.mark.asyncio
     async def test_unknown_path_returns_404(self):
         """Non-/health paths should return 404."""
-        await start_health_server(port=18082, run_mode="polling")
-        reader, writer = await asyncio.open_connection("127.0.0.1", 18082)
-        writer.write(b"GET /unknown HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await _handler_get("polling", "/unknown")
+        assert b"404 Not Found" in response
+
+    async def test_request_body_is_skipped(self):
+        """A POST body must not be parsed as the next request on a kept-alive connection."""
+        reader, writer, handled = await _open_handler("polling")
+        writer.write(
+            b"POST /health HTTP/1.1\r\nHost: localhost\r\nContent-Length: 11\r\n\r\nGET /x HTTP"
+            b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+        )
+        await writer.drain()
+        assert b"404 Not Found" in await _read_response(reader)
+        assert b"200 OK" in await _read_response(reader)
+        assert await asyncio.wait_for(reader.read(), timeout=5.0) == b""
+        await handled
+        writer.close()
+
+    async def test_unskippable_body_closes_connection(self):
+        """A chunked body can't be skipped, so the response closes the connection."""
+        reader, writer, handled = await _open_handler("polling")
+        writer.write(b"POST /health HTTP/1.1\r\nHost: localhost\r\nTransfer-Encoding: chunked\r\n\r\n")
+        await writer.drain()
+        assert b"Connection: close" in await _read_response(reader)
+        await asyncio.wait_for(handled, timeout=5.0)
+        writer.close()
+
+    async def test_incomplete_head_is_answered(self):
+        """A request without the closing blank line is answered at once, then the connection closes."""
+        reader, writer, handled = await _open_handler("polling")
+        writer.write(b"GET /health HTTP/1.0\r\n")
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=1.0)
+        assert b"200 OK" in response
+        assert b"Connection: close" in response
+        await handled
+        writer.close()
+
+    async def test_connection_close_ends_stream(self):
+        """A request with Connection: close should get its response and then EOF."""
+        reader, writer, handled = await _open_handler("polling")
+        writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        response = await _read_response(reader)
+        assert b"Connection: close" in response
+        assert await asyncio.wait_for(reader.read(), timeout=5.0) == b""
+        await asyncio.wait_for(handled, timeout=5.0)
+        writer.close()
+
+    async def test_pipelined_requests_answered_in_order(self):
+        """Two requests sent in one write get two responses, in request order."""
+        reader, writer, handled = await _open_handler("polling")
+        writer.write(
+            b"GET /unknown HTTP/1.1\r\nHost: localhost\r\n\r\n"
+            b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+        )
         await writer.drain()
-        response = await asyncio.wait_for(reader.read(4096), timeout=5.0)
+        first = await _read_response(reader)
+        assert b"404 Not Found" in first
+        assert b"Connection: keep-alive" in first
+        second = await _read_response(reader)
+        assert b"200 OK" in second
+        assert _json_body(second)["status"] == "ok"
+        assert await asyncio.wait_for(reader.read(), timeout=5.0) == b""
+        await handled
         writer.close()
-        assert "404 Not Found" in response.decode()
 
-    @pytest.mark.asyncio
+
+@pytest.mark.asyncio(loop_scope="class")
+class TestHealthCheckServer:
+    """Integration test over real TCP — one server shared by the class."""
+
+    async def test_health_endpoint_over_tcp(self, polling_port):
+        """The listening server should answer GET /health with 200 OK."""
+        response = await _http_get(polling_port, "/health")
+        assert b"200 OK" in response
+
+
+@pytest.mark.asyncio(loop_scope="class")
+class TestHealthServerLifecycle:
+    """Start/stop behaviour of the health check server."""
+
+    @pytest_asyncio.fixture(autouse=True, loop_scope="class")
+    async def _cleanup_server(self):
+        """Ensure the health check server is stopped after each test."""
+        yield
+        await stop_health_server()
+
     async def test_stop_server_idempotent(self):
         """Stopping a non-running server should not raise."""
         await stop_health_server()  # should be a no-op
 
-    @pytest.mark.asyncio
+    async def test_start_returns_bound_port(self):
+        """Binding port 0 should report the ephemeral port actually chosen."""
+        port = await start_health_server(port=0, run_mode="polling")
+        assert port > 0
+
     async def test_start_stop_lifecycle(self):
-        """Server should start and stop cleanly."""
-        await start_health_server(port=18083, run_mode="polling")
-        # Verify it's listening
-        reader, writer = await asyncio.open_connection("127.0.0.1", 18083)
-        writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        """Server should start, answer pipelined requests on one connection, and stop cleanly."""
+        port = await start_health_server(port=0, run_mode="polling")
+        # Verify it's listening: two keep-alive requests back-to-back on a single connection
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        request = b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: keep-alive\r\n\r\n"
+        writer.write(request * 2)
         await writer.drain()
-        response = await asyncio.wait_for(reader.read(4096), timeout=5.0)
+        for _ in range(2):
+            response = await _read_response(reader)
+            assert b"200 OK" in response
+            assert b"Connection: keep-alive" in response
+            assert _json_body(response)["status"] == "ok"
         writer.close()
-        assert "200 OK" in response.decode()
+        await writer.wait_closed()
         # Stop
         await stop_health_server()
         # Verify it's no longer listening
         with pytest.raises(OSError):
-            await asyncio.open_connection("127.0.0.1", 18083)
+            await asyncio.open_connection("127.0.0.1", port)
+
+    async def test_stop_closes_idle_keep_alive_connections(self):
+        """Stopping should not wait for idle keep-alive clients to time out."""
+        port = await start_health_server(port=0, run_mode="polling")
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        assert b"Connection: keep-alive" in await _read_response(reader)
+
+        await asyncio.wait_for(stop_health_server(), timeout=1.0)
+        assert await asyncio.wait_for(reader.read(), timeout=1.0) == b""
+        writer.close()
 
 
 # ---------------------------------------------------------------------------
@@ -123,8 +266,6 @@ class TestJSONFormatter:
         try:
             raise ValueError("test error")
         except ValueError:
-            import sys
-
             exc_info = sys.exc_info()
 
         record = logging.LogRecord(
@@ -142,6 +283,17 @@ class TestJSONFormatter:
         assert "exception" in data
         assert "ValueError" in data["exception"]
 
+    def test_json_format_reuses_cached_exc_text(self):
+        formatter = JSONFormatter()
+        try:
+            raise ValueError("test error")
+        except ValueError:
+            record = logging.makeLogRecord({"name": "test", "msg": "boom", "exc_info": sys.exc_info()})
+        first = formatter.format(record)
+        with patch.object(formatter, "formatException") as mock_format_exception:
+            assert formatter.format(record) == first
+        mock_format_exception.assert_not_called()
+
     def test_json_format_with_extra_fields(self):
         formatter = JSONFormatter()
         record = logging.LogRecord(
@@ -160,6 +312,43 @@ class TestJSONFormatter:
         assert data["user_id"] == 12345
         assert data["zone"] == "Bugis"
 
+    def test_json_format_includes_arbitrary_extras_only(self):
+        formatter = JSONFormatter()
+        record = logging.makeLogRecord({"name": "test", "msg": "hi", "sighting_id": 7})
+        data = json.loads(formatter.format(record))
+        assert data["sighting_id"] == 7
+        # Standard LogRecord attributes are not dumped as extras
+        assert "lineno" not in data
+        assert "args" not in data
+
+    def test_json_extras_cannot_shadow_own_keys(self):
+        """Extras named like the formatter's own keys are renamed, not emitted as duplicates."""
+        formatter = JSONFormatter()
+        record = logging.makeLogRecord(
+            {
+                "name": "test",
+                "levelno": logging.INFO,
+                "levelname": "INFO",
+                "msg": "hi",
+                "level": "spoofed",
+                "logger": "x",
+                "timestamp": 0,
+            }
+        )
+        output = formatter.format(record)
+        data = json.loads(output)
+        assert output.count('"level":') == 1
+        assert (data["level"], data["logger"]) == ("INFO", "test")
+        assert data["timestamp"] != 0
+        assert (data["extra_level"], data["extra_logger"], data["extra_timestamp"]) == ("spoofed", "x", 0)
+
+    def test_json_format_with_lone_surrogate(self):
+        """A message that isn't valid UTF-8 text is still logged, \\u-escaped."""
+        formatter = JSONFormatter()
+        record = logging.LogRecord("test", logging.INFO, "test.py", 1, "user %s", ("x\ud800y",), None)
+        assert json.loads(formatter.format_bytes(record))["message"] == "user x\ud800y"
+        assert json.loads(formatter.format(record))["message"] == "user x\ud800y"
+
     def test_json_timestamp_is_utc(self):
         formatter = JSONFormatter()
         record = logging.LogRecord(
@@ -176,6 +365,22 @@ class TestJSONFormatter:
         ts = datetime.fromisoformat(data["timestamp"])
         assert ts.tzinfo is not None  # should be timezone-aware
 
+    def test_json_timestamp_matches_record_time(self):
+        formatter = JSONFormatter()
+        record = logging.LogRecord("test", logging.INFO, "test.py", 1, "test", (), None)
+        record.created = 1771000000.25
+        record.msecs = 250.0
+        data = json.loads(formatter.format(record))
+        assert data["timestamp"] == "2026-02-13T16:26:40.250+00:00"
+
+    def test_format_bytes_matches_format(self):
+        formatter = JSONFormatter()
+        record = logging.LogRecord("test", logging.INFO, "test.py", 1, "café ☕", (), None)
+        raw = formatter.format_bytes(record)
+        assert isinstance(raw, bytes)
+        assert raw.decode() == formatter.format(record)
+        assert json.loads(raw)["message"] == "café ☕"
+
     def test_json_output_is_single_line(self):
         formatter = JSONFormatter()
         record = logging.LogRecord(
@@ -192,6 +397,41 @@ class TestJSONFormatter:
         assert "\n" not in output
 
 
+class TestBytesStreamHandler:
+    """Tests for the binary-layer handler used for JSON logs on stdout."""
+
+    def _record(self):
+        return logging.LogRecord("test", logging.INFO, "test.py", 1, "msg", (), None)
+
+    def test_json_written_as_bytes(self):
+        stream = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        handler = BytesStreamHandler(stream)
+        handler.setFormatter(JSONFormatter())
+        handler.handle(self._record())
+        line = stream.buffer.getvalue()
+        assert line.endswith(b"\n")
+        assert json.loads(line)["message"] == "msg"
+
+    def test_text_formatter_is_encoded(self):
+        stream = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        BytesStreamHandler(stream).handle(self._record())
+        assert stream.buffer.getvalue() == b"msg\n"
+
+    def test_pending_text_is_written_first(self):
+        """print() output still buffered in the text layer must not end up after the log line."""
+        stream = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        stream.write("printed\n")
+        BytesStreamHandler(stream).handle(self._record())
+        assert stream.buffer.getvalue() == b"printed\nmsg\n"
+
+
+def _get_effective_handler(root: logging.Logger) -> logging.Handler:
+    """Return the stream handler behind the root logger's QueueHandler."""
+    assert isinstance(root.handlers[0], QueueHandler)
+    assert logging_config._listener is not None
+    return logging_config._listener.handlers[0]
+
+
 class TestSetupLogging:
     """Tests for the setup_logging function."""
 
@@ -199,20 +439,41 @@ class TestSetupLogging:
         setup_logging(log_format="text")
         root = logging.getLogger()
         assert len(root.handlers) > 0
-        handler = root.handlers[0]
+        handler = _get_effective_handler(root)
         assert not isinstance(handler.formatter, JSONFormatter)
 
     def test_setup_json_format(self):
         setup_logging(log_format="json")
         root = logging.getLogger()
         assert len(root.handlers) > 0
-        handler = root.handlers[0]
+        handler = _get_effective_handler(root)
         assert isinstance(handler.formatter, JSONFormatter)
 
+    def test_listener_is_the_only_buffering_layer(self):
+        """The listener's handler writes each record through rather than buffering it again."""
+        setup_logging(log_format="json")
+        assert type(_get_effective_handler(logging.getLogger())) in (logging.StreamHandler, BytesStreamHandler)
+
+    def test_records_written_by_listener(self):
+        stream = io.StringIO()
+        with patch("sys.stdout", stream):
+            setup_logging(log_format="json")
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logging.getLogger("test.queue").exception("failed %s", "here", extra={"zone": "Bugis"})
+            logging_config._stop_listener()  # drains the queue
+        setup_logging(log_format="text")
+        data = json.loads(stream.getvalue())
+        assert data["message"] == "failed here"
+        assert data["zone"] == "Bugis"
+        assert "ValueError" in data["exception"]
+
     def test_setup_suppresses_noisy_loggers(self):
         setup_logging(log_format="text")
         assert logging.getLogger("httpx").level == logging.WARNING
         assert logging.getLogger("httpcore").level == logging.WARNING
+        assert logging.getLogger("telegram.ext").level == logging.WARNING
 
     def test_setup_removes_duplicate_handlers(self):
         """Calling setup_logging twice should not duplicate handlers."""
@@ -226,41 +487,31 @@ class TestSetupLogging:
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
+_SEMVER_RE = re.compile(r"\A\d+\.\d+\.\d+\Z")
+
+
 class TestPhase7Config:
     """Tests for Phase 7 configuration variables."""
 
     def test_bot_version_format(self):
         assert isinstance(BOT_VERSION, str)
-        parts = BOT_VERSION.split(".")
-        assert len(parts) == 3
-        for part in parts:
-            assert part.isdigit()
+        assert _SEMVER_RE.match(BOT_VERSION)
 
     def test_default_log_format(self):
-        from config import LOG_FORMAT
-
         assert LOG_FORMAT in ("text", "json")
 
     def test_default_health_check_enabled(self):
-        from config import HEALTH_CHECK_ENABLED
-
         assert isinstance(HEALTH_CHECK_ENABLED, bool)
 
     def test_default_port_is_int(self):
-        from config import PORT
-
         assert isinstance(PORT, int)
         assert PORT > 0
 
     def test_sentry_dsn_default_none(self):
-        from config import SENTRY_DSN
-
         # In test environment, SENTRY_DSN should not be set
         assert SENTRY_DSN is None
 
     def test_webhook_url_default_none(self):
-        from config import WEBHOOK_URL
-
         # In test environment, WEBHOOK_URL should not be set
         assert WEBHOOK_URL is None
 
@@ -273,20 +524,16 @@ class TestSentryInit:
 
     def test_sentry_init_skipped_when_no_dsn(self):
         """_init_sentry should be a no-op when SENTRY_DSN is not set."""
-        from bot.main import _init_sentry
-
         # Should not raise
         with patch("bot.main.SENTRY_DSN", None):
-            _init_sentry()
+            bot_main._init_sentry()
 
     def test_sentry_init_warns_when_sdk_missing(self):
         """_init_sentry should warn (not crash) if sentry-sdk is not installed."""
-        from bot.main import _init_sentry
-
         with (
             patch("bot.main.SENTRY_DSN", "https://fake@sentry.io/0"),
             patch.dict("sys.modules", {"sentry_sdk": None}),
             patch("bot.main.logger") as mock_logger,
         ):
-            _init_sentry()
+            bot_main._init_sentry()
             mock_logger.warning.assert_called_once()
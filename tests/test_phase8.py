@@ -4,10 +4,16 @@ Tests for admin authentication, statistics dashboard, user/zone lookup,
 audit logging, and admin command routing.
 """
 
-from datetime import datetime, timedelta, timezone
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
 
 import pytest
+import pytest_asyncio
+
+from bot.database import Database, SightingIn
+from bot.main import ADMIN_COMMAND_NAMES, ADMIN_COMMANDS_DETAILED, ALL_ZONES, admin_only, resolve_zone
+from config import ADMIN_USER_IDS, BOT_VERSION, _parse_admin_ids
 
 
 # ---------------------------------------------------------------------------
@@ -17,58 +23,23 @@ class TestAdminConfig:
     """Tests for ADMIN_USER_IDS configuration parsing."""
 
     def test_admin_user_ids_is_set(self):
-        from config import ADMIN_USER_IDS
-
         assert isinstance(ADMIN_USER_IDS, set)
 
-    def test_admin_user_ids_default_empty(self):
-        """ADMIN_USER_IDS should be empty when env var is not set."""
-        import os
-
-        with patch.dict(os.environ, {"ADMIN_USER_IDS": ""}, clear=False):
-            # Re-parse
-            raw = os.environ.get("ADMIN_USER_IDS", "")
-            result = set()
-            if raw.strip():
-                for _id in raw.split(","):
-                    _id = _id.strip()
-                    if _id.isdigit():
-                        result.add(int(_id))
-            assert result == set()
-
-    def test_admin_user_ids_single(self):
-        """Single admin ID should be parsed correctly."""
-        raw = "123456789"
-        result = set()
-        for _id in raw.split(","):
-            _id = _id.strip()
-            if _id.isdigit():
-                result.add(int(_id))
-        assert result == {123456789}
-
-    def test_admin_user_ids_multiple(self):
-        """Multiple admin IDs should be parsed correctly."""
-        raw = "123456789, 987654321, 111222333"
-        result = set()
-        for _id in raw.split(","):
-            _id = _id.strip()
-            if _id.isdigit():
-                result.add(int(_id))
-        assert result == {123456789, 987654321, 111222333}
-
-    def test_admin_user_ids_ignores_invalid(self):
-        """Non-numeric values should be silently ignored."""
-        raw = "123456789, abc, , 987654321"
-        result = set()
-        for _id in raw.split(","):
-            _id = _id.strip()
-            if _id.isdigit():
-                result.add(int(_id))
-        assert result == {123456789, 987654321}
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            ("", set()),
+            ("123456789", {123456789}),
+            ("123456789, 987654321, 111222333", {123456789, 987654321, 111222333}),
+            ("123456789, abc, , 987654321", {123456789, 987654321}),
+        ],
+        ids=["empty", "single", "multiple", "ignores-invalid"],
+    )
+    def test_parse_admin_ids(self, raw, expected):
+        """Comma-separated IDs are parsed; blank and non-numeric entries are ignored."""
+        assert _parse_admin_ids(raw) == expected
 
     def test_bot_version_updated(self):
-        from config import BOT_VERSION
-
         assert BOT_VERSION == "1.3.0"
 
 
@@ -78,10 +49,9 @@ class TestAdminConfig:
 class TestAdminOnly:
     """Tests for the admin_only decorator."""
 
-    def test_admin_only_rejects_non_admin(self):
+    @pytest.mark.asyncio
+    async def test_admin_only_rejects_non_admin(self, fake_update):
         """Non-admin users should receive 'Unknown command' response."""
-        from bot.main import admin_only
-
         called = False
 
         async def handler(update, context):
@@ -90,24 +60,18 @@ class TestAdminOnly:
 
         decorated = admin_only(handler)
 
-        # Mock non-admin user
-        update = MagicMock()
-        update.effective_user.id = 999999
-        update.message.reply_text = AsyncMock()
-
-        import asyncio
+        update = fake_update(999999)  # non-admin user
 
         with patch("bot.handlers.admin.ADMIN_USER_IDS", {123456}):
-            asyncio.get_event_loop().run_until_complete(decorated(update, MagicMock()))
+            await decorated(update, None)
 
         assert not called
         update.message.reply_text.assert_called_once()
         assert "Unknown command" in update.message.reply_text.call_args[0][0]
 
-    def test_admin_only_allows_admin(self):
+    @pytest.mark.asyncio
+    async def test_admin_only_allows_admin(self, fake_update):
         """Admin users should be allowed through."""
-        from bot.main import admin_only
-
         called = False
 
         async def handler(update, context):
@@ -116,16 +80,13 @@ class TestAdminOnly:
 
         decorated = admin_only(handler)
 
-        update = MagicMock()
-        update.effective_user.id = 123456
-        update.message.reply_text = AsyncMock()
-
-        import asyncio
+        update = fake_update(123456)
 
         with patch("bot.handlers.admin.ADMIN_USER_IDS", {123456}):
-            asyncio.get_event_loop().run_until_complete(decorated(update, MagicMock()))
+            await decorated(update, None)
 
         assert called
+        update.message.reply_text.assert_not_called()
 
 
 # ---------------------------------------------------------------------------
@@ -135,27 +96,27 @@ class TestAdminAuditLog:
     """Tests for the admin_actions audit log database operations."""
 
     @pytest.mark.asyncio
-    async def test_log_admin_action(self, db):
-        """Should insert an admin action record."""
-        await db.log_admin_action(123456, "view_stats")
-        entries = await db.get_admin_log(10)
-        assert len(entries) == 1
-        assert entries[0]["admin_id"] == 123456
-        assert entries[0]["action"] == "view_stats"
-
-    @pytest.mark.asyncio
-    async def test_log_admin_action_with_target(self, db):
-        """Should store target field."""
-        await db.log_admin_action(123456, "lookup_user", target="789")
-        entries = await db.get_admin_log(10)
-        assert entries[0]["target"] == "789"
-
-    @pytest.mark.asyncio
-    async def test_log_admin_action_with_detail(self, db):
-        """Should store detail field."""
-        await db.log_admin_action(123456, "lookup_zone", target="Bugis", detail="Zone lookup")
-        entries = await db.get_admin_log(10)
-        assert entries[0]["detail"] == "Zone lookup"
+    @pytest.mark.parametrize(
+        "payloads",
+        [
+            [(123456, "view_stats", None, None)],
+            [(123456, "lookup_user", "789", None)],
+            [(123456, "lookup_zone", "Bugis", "Zone lookup")],
+            [
+                (111, "view_stats", None, None),
+                (222, "lookup_user", "789", None),
+                (333, "lookup_zone", "Bugis", "Zone lookup"),
+            ],
+        ],
+        ids=["minimal", "with-target", "with-detail", "mixed-batch"],
+    )
+    async def test_log_admin_action_matrix(self, db, payloads):
+        """Each logged action should be stored with its fields and a created_at timestamp."""
+        await db.log_admin_actions_bulk(payloads)
+        entries = await db.get_admin_log(len(payloads))
+        stored = [(e["admin_id"], e["action"], e["target"], e["detail"]) for e in reversed(entries)]
+        assert stored == payloads
+        assert all(e["created_at"] is not None for e in entries)
 
     @pytest.mark.asyncio
     async def test_admin_log_ordering(self, db):
@@ -171,11 +132,28 @@ class TestAdminAuditLog:
     @pytest.mark.asyncio
     async def test_admin_log_limit(self, db):
         """Should respect the limit parameter."""
-        for i in range(10):
-            await db.log_admin_action(111, f"action_{i}")
+        await db.log_admin_actions_bulk([(111, f"action_{i}", None, None) for i in range(10)])
         entries = await db.get_admin_log(3)
         assert len(entries) == 3
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "before_index,expected",
+        [
+            (None, ["action_9", "action_8", "action_7"]),
+            (7, ["action_6", "action_5", "action_4"]),
+            (1, ["action_0"]),
+        ],
+        ids=["first-page", "next-page", "last-page"],
+    )
+    async def test_admin_log_keyset_pagination(self, db, before_index, expected):
+        """before_id should return the page of entries older than that id."""
+        await db.log_admin_actions_bulk([(111, f"action_{i}", None, None) for i in range(10)])
+        ids = {e["action"]: e["id"] for e in await db.get_admin_log(10)}
+        before_id = None if before_index is None else ids[f"action_{before_index}"]
+        entries = await db.get_admin_log(3, before_id=before_id)
+        assert [e["action"] for e in entries] == expected
+
     @pytest.mark.asyncio
     async def test_admin_log_empty(self, db):
         """Should return empty list when no entries exist."""
@@ -183,11 +161,68 @@ class TestAdminAuditLog:
         assert entries == []
 
     @pytest.mark.asyncio
-    async def test_admin_log_created_at_populated(self, db):
-        """created_at should be automatically set."""
-        await db.log_admin_action(123, "test_action")
-        entries = await db.get_admin_log(1)
-        assert entries[0]["created_at"] is not None
+    async def test_log_admin_action_is_written_inline_on_sqlite(self, db):
+        """On SQLite the entry is written before log_admin_action returns, with nothing queued."""
+        await db.log_admin_action(123456, "view_stats")
+        assert db._audit_queue.qsize() == 0
+        row = await db._fetchone("SELECT COUNT(*) AS cnt FROM admin_actions")
+        assert row["cnt"] == 1
+
+    @pytest.mark.asyncio
+    async def test_audit_writer_writes_queued_entries(self, db):
+        """With the background writer running (as on PostgreSQL), entries are queued and flush_audit waits for them."""
+        db._audit_task = asyncio.create_task(db._audit_writer())
+        try:
+            await db.log_admin_actions_bulk([(123456, "view_stats", None, None), (123456, "ban", "42", None)])
+            assert db._audit_queue.qsize() == 2
+            await db.flush_audit()
+            row = await db._fetchone("SELECT COUNT(*) AS cnt FROM admin_actions")
+            assert row["cnt"] == 2
+        finally:
+            db._audit_task.cancel()
+            db._audit_task = None
+
+    @pytest.mark.asyncio
+    async def test_audit_write_waits_for_open_transaction(self, db, monkeypatch):
+        """An audit insert issued mid-ban must not commit the ban's half-applied transaction."""
+        trace = []
+        execute, executemany, commit = db._conn.execute, db._conn.executemany, db._conn.commit
+
+        async def traced_execute(sql, *args):
+            trace.append(sql.split()[0])
+            await asyncio.sleep(0)  # give the other task a chance to run between statements
+            return await execute(sql, *args)
+
+        async def traced_executemany(sql, *args):
+            trace.append("AUDIT")
+            return await executemany(sql, *args)
+
+        async def traced_commit():
+            trace.append("COMMIT")
+            return await commit()
+
+        monkeypatch.setattr(db._conn, "execute", traced_execute)
+        monkeypatch.setattr(db._conn, "executemany", traced_executemany)
+        monkeypatch.setattr(db._conn, "commit", traced_commit)
+        await asyncio.gather(db.ban_user(42, banned_by=111), db.log_admin_action(111, "ban", "42"))
+
+        assert trace == ["INSERT", "DELETE", "COMMIT", "AUDIT", "COMMIT"]
+
+    @pytest.mark.asyncio
+    async def test_close_keeps_logged_audit_entries(self, tmp_path):
+        """Audit entries logged before close should be in the database file afterwards."""
+        db_path = str(tmp_path / "audit.db")
+        database = Database(f"sqlite:///{db_path}")
+        await database.connect()
+        await database.create_tables()
+        await database.log_admin_action(1, "queued")
+        await database.close()
+
+        reopened = Database(f"sqlite:///{db_path}")
+        await reopened.connect()
+        entries = await reopened.get_admin_log(10)
+        await reopened.close()
+        assert [e["action"] for e in entries] == ["queued"]
 
 
 # ---------------------------------------------------------------------------
@@ -209,7 +244,7 @@ class TestGlobalStats:
         assert stats["feedback_negative"] == 0
 
     @pytest.mark.asyncio
-    async def test_get_global_stats_with_data(self, db):
+    async def test_get_global_stats_with_data(self, db, fixed_now):
         """Should return correct counts with populated data."""
         # Add users
         await db.ensure_user(100, "alice")
@@ -221,22 +256,21 @@ class TestGlobalStats:
         await db.add_subscription(200, "Bugis")
 
         # Add sighting
-        now = datetime.now(timezone.utc)
         await db.add_sighting(
-            {
-                "id": "sight1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": 1.3008,
-                "lng": 103.8553,
-            }
+            SightingIn(
+                id="sight1",
+                zone="Bugis",
+                description="Test",
+                time=fixed_now,
+                reporter_id=100,
+                reporter_name="alice",
+                reporter_badge="⭐ Regular",
+                lat=1.3008,
+                lng=103.8553,
+            )
         )
 
-        stats = await db.get_global_stats()
+        stats = await db.get_global_stats(now=fixed_now)
         assert stats["total_users"] == 2
         assert stats["total_sightings"] == 1
         assert stats["sightings_24h"] == 1
@@ -271,63 +305,135 @@ class TestGlobalStats:
         assert len(top) == 1
 
     @pytest.mark.asyncio
-    async def test_get_top_zones_by_sightings(self, db):
+    async def test_get_top_zones_by_sightings(self, db, fixed_now):
         """Should return zones ordered by recent sighting count."""
-        now = datetime.now(timezone.utc)
-        for i in range(3):
-            await db.add_sighting(
-                {
-                    "id": f"s_bugis_{i}",
-                    "zone": "Bugis",
-                    "description": "Test",
-                    "time": now - timedelta(hours=i),
-                    "reporter_id": 100,
-                    "reporter_name": "alice",
-                    "reporter_badge": "⭐ Regular",
-                    "lat": None,
-                    "lng": None,
-                }
-            )
+        await db.add_sightings_bulk(
+            [
+                SightingIn(
+                    id=f"s_bugis_{i}",
+                    zone="Bugis",
+                    description="Test",
+                    time=fixed_now - timedelta(hours=i),
+                    reporter_id=100,
+                    reporter_name="alice",
+                    reporter_badge="⭐ Regular",
+                )
+                for i in range(3)
+            ]
+        )
         await db.add_sighting(
-            {
-                "id": "s_orchard_0",
-                "zone": "Orchard",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 200,
-                "reporter_name": "bob",
-                "reporter_badge": "🆕 New",
-                "lat": None,
-                "lng": None,
-            }
+            SightingIn(
+                id="s_orchard_0",
+                zone="Orchard",
+                description="Test",
+                time=fixed_now,
+                reporter_id=200,
+                reporter_name="bob",
+                reporter_badge="🆕 New",
+            )
         )
 
-        top = await db.get_top_zones_by_sightings(5, days=7)
+        top = await db.get_top_zones_by_sightings(5, days=7, now=fixed_now)
         assert len(top) == 2
         assert top[0]["zone"] == "Bugis"
         assert top[0]["sighting_count"] == 3
 
     @pytest.mark.asyncio
-    async def test_get_top_zones_by_sightings_excludes_old(self, db):
+    async def test_get_top_zones_by_sightings_excludes_old(self, db, fixed_now):
         """Should exclude sightings older than the time window."""
-        now = datetime.now(timezone.utc)
         await db.add_sighting(
-            {
-                "id": "old_sight",
-                "zone": "Bugis",
-                "description": "Old",
-                "time": now - timedelta(days=30),
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
+            SightingIn(
+                id="old_sight",
+                zone="Bugis",
+                description="Old",
+                time=fixed_now - timedelta(days=30),
+                reporter_id=100,
+                reporter_name="alice",
+                reporter_badge="⭐ Regular",
+            )
         )
 
-        top = await db.get_top_zones_by_sightings(5, days=7)
+        top = await db.get_top_zones_by_sightings(5, days=7, now=fixed_now)
         assert len(top) == 0
 
+    @pytest.mark.asyncio
+    async def test_global_stats_cached_between_calls(self, db):
+        """Repeat calls should be served from the cache without querying again."""
+        first = await db.get_global_stats()
+        with patch.object(db, "_fetchone", AsyncMock()) as mock_fetchone:
+            assert await db.get_global_stats() == first
+        mock_fetchone.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stats_cache_invalidated_by_writes(self, db):
+        """Writes to stats tables should invalidate cached aggregates."""
+        assert (await db.get_global_stats())["active_subscriptions"] == 0
+        assert await db.get_top_zones_by_subscribers(5) == []
+
+        await db.add_subscription(100, "Bugis")
+
+        assert (await db.get_global_stats())["active_subscriptions"] == 1
+        assert (await db.get_top_zones_by_subscribers(5))[0]["zone_name"] == "Bugis"
+
+    @pytest.mark.asyncio
+    async def test_explicit_now_bypasses_stats_cache(self, db, fixed_now):
+        """Stats for a pinned time should be computed fresh and not stored in the cache."""
+        await db.get_global_stats(now=fixed_now)
+        await db.get_top_zones_by_sightings(5, days=7, now=fixed_now)
+        assert db._stats_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_stats_cache_ignores_audit_log_writes(self, db):
+        """Logging an admin action should not throw away cached stats."""
+        await db.get_global_stats()
+        await db.log_admin_action(111, "view_stats")
+        assert ("global_stats",) in db._stats_cache
+
+
+# ---------------------------------------------------------------------------
+# Read-only lookup fixture
+# ---------------------------------------------------------------------------
+# Rows seeded once for the lookup tests below. Bugis sightings by age:
+# alice 0h/3d/30d, bob 2d — so 1 in 24h, 3 in 7d, 4 all-time.
+_GOLDEN_SIGHTINGS = [
+    ("sight_0", 100, "alice", timedelta(0)),
+    ("sight_1", 100, "alice", timedelta(days=3)),
+    ("sight_2", 100, "alice", timedelta(days=30)),
+    ("sight_3", 200, "bob", timedelta(days=2)),
+]
+_GOLDEN_SUBSCRIPTIONS = [(100, "Orchard"), (100, "Bugis"), (100, "Tanjong Pagar"), (200, "Bugis")]
+
+
+@pytest_asyncio.fixture(scope="module")
+async def seeded_db(fixed_now):
+    """A database seeded once with the golden rows above, shared by read-only tests.
+
+    Tests using it must not write; those that do take the function-scoped db fixture.
+    """
+    database = Database("sqlite:///:memory:")
+    await database.connect()
+    await database.create_tables()
+    await database.ensure_user(100, "alice")
+    await database.ensure_user(200, "bob")
+    for user_id, zone in _GOLDEN_SUBSCRIPTIONS:
+        await database.add_subscription(user_id, zone)
+    await database.add_sightings_bulk(
+        [
+            SightingIn(
+                id=sighting_id,
+                zone="Bugis",
+                description=f"Test {i}",
+                time=fixed_now - age,
+                reporter_id=reporter_id,
+                reporter_name=reporter_name,
+                reporter_badge="⭐ Regular",
+            )
+            for i, (sighting_id, reporter_id, reporter_name, age) in enumerate(_GOLDEN_SIGHTINGS)
+        ]
+    )
+    yield database
+    await database.close()
+
 
 # ---------------------------------------------------------------------------
 # User Lookup (Database)
@@ -336,87 +442,63 @@ class TestUserLookup:
     """Tests for admin user lookup database methods."""
 
     @pytest.mark.asyncio
-    async def test_get_user_details(self, db):
+    async def test_get_user_details(self, seeded_db):
         """Should return user details by telegram_id."""
-        await db.ensure_user(100, "alice")
-        user = await db.get_user_details(100)
+        user = await seeded_db.get_user_details(100)
         assert user is not None
         assert user["telegram_id"] == 100
         assert user["username"] == "alice"
 
     @pytest.mark.asyncio
-    async def test_get_user_details_not_found(self, db):
+    async def test_get_user_details_not_found(self, seeded_db):
         """Should return None for non-existent user."""
-        user = await db.get_user_details(999)
+        user = await seeded_db.get_user_details(999)
         assert user is None
 
     @pytest.mark.asyncio
-    async def test_get_user_by_username(self, db):
+    async def test_get_user_by_username(self, seeded_db):
         """Should find user by username."""
-        await db.ensure_user(100, "alice")
-        user = await db.get_user_by_username("alice")
+        user = await seeded_db.get_user_by_username("alice")
         assert user is not None
         assert user["telegram_id"] == 100
 
     @pytest.mark.asyncio
-    async def test_get_user_by_username_with_at(self, db):
+    async def test_get_user_by_username_with_at(self, seeded_db):
         """Should strip leading @ from username."""
-        await db.ensure_user(100, "alice")
-        user = await db.get_user_by_username("@alice")
+        user = await seeded_db.get_user_by_username("@alice")
         assert user is not None
         assert user["telegram_id"] == 100
 
     @pytest.mark.asyncio
-    async def test_get_user_by_username_not_found(self, db):
+    async def test_get_user_by_username_not_found(self, seeded_db):
         """Should return None for non-existent username."""
-        user = await db.get_user_by_username("nobody")
+        user = await seeded_db.get_user_by_username("nobody")
         assert user is None
 
     @pytest.mark.asyncio
-    async def test_get_user_recent_sightings(self, db):
+    async def test_get_user_recent_sightings(self, seeded_db):
         """Should return recent sightings for a user."""
-        await db.ensure_user(100, "alice")
-        now = datetime.now(timezone.utc)
-        for i in range(5):
-            await db.add_sighting(
-                {
-                    "id": f"sight_{i}",
-                    "zone": "Bugis",
-                    "description": f"Test {i}",
-                    "time": now - timedelta(hours=i),
-                    "reporter_id": 100,
-                    "reporter_name": "alice",
-                    "reporter_badge": "⭐ Regular",
-                    "lat": None,
-                    "lng": None,
-                }
-            )
-
-        recent = await db.get_user_recent_sightings(100, 3)
-        assert len(recent) == 3
+        recent = await seeded_db.get_user_recent_sightings(100, 2)
+        assert len(recent) == 2
         # Should be newest first
-        assert recent[0]["id"] == "sight_0"
+        assert [s["id"] for s in recent] == ["sight_0", "sight_1"]
 
     @pytest.mark.asyncio
-    async def test_get_user_recent_sightings_empty(self, db):
+    async def test_get_user_recent_sightings_empty(self, seeded_db):
         """Should return empty list for user with no sightings."""
-        recent = await db.get_user_recent_sightings(999, 10)
+        recent = await seeded_db.get_user_recent_sightings(999, 10)
         assert recent == []
 
     @pytest.mark.asyncio
-    async def test_get_user_subscriptions_list(self, db):
+    async def test_get_user_subscriptions_list(self, seeded_db):
         """Should return sorted list of subscribed zones."""
-        await db.add_subscription(100, "Orchard")
-        await db.add_subscription(100, "Bugis")
-        await db.add_subscription(100, "Tanjong Pagar")
-
-        subs = await db.get_user_subscriptions_list(100)
+        subs = await seeded_db.get_user_subscriptions_list(100)
         assert subs == ["Bugis", "Orchard", "Tanjong Pagar"]
 
     @pytest.mark.asyncio
-    async def test_get_user_subscriptions_list_empty(self, db):
+    async def test_get_user_subscriptions_list_empty(self, seeded_db):
         """Should return empty list for user with no subscriptions."""
-        subs = await db.get_user_subscriptions_list(999)
+        subs = await seeded_db.get_user_subscriptions_list(999)
         assert subs == []
 
 
@@ -427,75 +509,26 @@ class TestZoneLookup:
     """Tests for admin zone lookup database methods."""
 
     @pytest.mark.asyncio
-    async def test_get_zone_details(self, db):
-        """Should return zone statistics."""
-        await db.add_subscription(100, "Bugis")
-        await db.add_subscription(200, "Bugis")
-
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "sight1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
-
-        details = await db.get_zone_details("Bugis")
+    async def test_get_zone_details(self, seeded_db, fixed_now):
+        """Should return zone statistics, each sighting counter covering only its own window."""
+        details = await seeded_db.get_zone_details("Bugis", now=fixed_now)
         assert details["zone_name"] == "Bugis"
         assert details["subscriber_count"] == 2
         assert details["sightings_24h"] == 1
-        assert details["sightings_7d"] == 1
-        assert details["sightings_all"] == 1
+        assert details["sightings_7d"] == 3
+        assert details["sightings_all"] == 4
 
     @pytest.mark.asyncio
-    async def test_get_zone_details_empty(self, db):
+    async def test_get_zone_details_empty(self, seeded_db, fixed_now):
         """Should return zero counts for zone with no data."""
-        details = await db.get_zone_details("Bugis")
+        details = await seeded_db.get_zone_details("Yishun", now=fixed_now)
         assert details["subscriber_count"] == 0
         assert details["sightings_all"] == 0
 
     @pytest.mark.asyncio
-    async def test_get_zone_top_reporters(self, db):
+    async def test_get_zone_top_reporters(self, seeded_db):
         """Should return reporters ordered by report count in zone."""
-        now = datetime.now(timezone.utc)
-        # alice: 3 reports
-        for i in range(3):
-            await db.add_sighting(
-                {
-                    "id": f"alice_{i}",
-                    "zone": "Bugis",
-                    "description": "Test",
-                    "time": now - timedelta(hours=i),
-                    "reporter_id": 100,
-                    "reporter_name": "alice",
-                    "reporter_badge": "⭐ Regular",
-                    "lat": None,
-                    "lng": None,
-                }
-            )
-        # bob: 1 report
-        await db.add_sighting(
-            {
-                "id": "bob_0",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 200,
-                "reporter_name": "bob",
-                "reporter_badge": "🆕 New",
-                "lat": None,
-                "lng": None,
-            }
-        )
-
-        top = await db.get_zone_top_reporters("Bugis", 5)
+        top = await seeded_db.get_zone_top_reporters("Bugis", 5)
         assert len(top) == 2
         assert top[0]["reporter_name"] == "alice"
         assert top[0]["report_count"] == 3
@@ -503,39 +536,23 @@ class TestZoneLookup:
         assert top[1]["report_count"] == 1
 
     @pytest.mark.asyncio
-    async def test_get_zone_top_reporters_empty(self, db):
+    async def test_get_zone_top_reporters_empty(self, seeded_db):
         """Should return empty list for zone with no reporters."""
-        top = await db.get_zone_top_reporters("Bugis", 5)
+        top = await seeded_db.get_zone_top_reporters("Yishun", 5)
         assert top == []
 
     @pytest.mark.asyncio
-    async def test_get_zone_recent_sightings(self, db):
+    async def test_get_zone_recent_sightings(self, seeded_db):
         """Should return most recent sightings in a zone."""
-        now = datetime.now(timezone.utc)
-        for i in range(5):
-            await db.add_sighting(
-                {
-                    "id": f"sight_{i}",
-                    "zone": "Bugis",
-                    "description": f"Test {i}",
-                    "time": now - timedelta(hours=i),
-                    "reporter_id": 100,
-                    "reporter_name": "alice",
-                    "reporter_badge": "⭐ Regular",
-                    "lat": None,
-                    "lng": None,
-                }
-            )
-
-        recent = await db.get_zone_recent_sightings("Bugis", 3)
+        recent = await seeded_db.get_zone_recent_sightings("Bugis", 3)
         assert len(recent) == 3
-        # Should be newest first
-        assert recent[0]["description"] == "Test 0"
+        # Should be newest first (sight_3, bob's 2-day-old report, is second)
+        assert [s["description"] for s in recent] == ["Test 0", "Test 3", "Test 1"]
 
     @pytest.mark.asyncio
-    async def test_get_zone_recent_sightings_empty(self, db):
+    async def test_get_zone_recent_sightings_empty(self, seeded_db):
         """Should return empty list for zone with no sightings."""
-        recent = await db.get_zone_recent_sightings("Bugis", 5)
+        recent = await seeded_db.get_zone_recent_sightings("Yishun", 5)
         assert recent == []
 
 
@@ -543,7 +560,7 @@ class TestZoneLookup:
 # Admin Table Schema
 # ---------------------------------------------------------------------------
 class TestAdminTableSchema:
-    """Tests that the admin_actions table is created correctly."""
+    """Tests that the admin_actions table and query indexes are created correctly."""
 
     @pytest.mark.asyncio
     async def test_admin_actions_table_exists(self, db):
@@ -562,6 +579,23 @@ class TestAdminTableSchema:
         # IDs should be different (newest first)
         assert entries[0]["id"] != entries[1]["id"]
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "where,index",
+        [
+            ("reporter_id = 100", "idx_sightings_reporter_time"),
+            ("zone = 'Bugis'", "idx_sightings_zone_time"),
+        ],
+    )
+    async def test_recent_sightings_use_index_without_sort(self, db, where, index):
+        """Newest-first sighting lookups should walk an index instead of sorting."""
+        rows = await db._fetchall(
+            f"EXPLAIN QUERY PLAN SELECT * FROM sightings WHERE {where} ORDER BY reported_at DESC LIMIT 5"
+        )
+        plan = " ".join(r["detail"] for r in rows)
+        assert index in plan
+        assert "TEMP B-TREE" not in plan
+
     @pytest.mark.asyncio
     async def test_admin_actions_nullable_fields(self, db):
         """target and detail should be nullable."""
@@ -579,19 +613,15 @@ class TestAdminHelp:
 
     def test_admin_commands_help_has_all_commands(self):
         """All Phase 8 admin commands should be listed in help."""
-        from bot.main import ADMIN_COMMANDS_HELP
-
-        assert "stats" in ADMIN_COMMANDS_HELP
-        assert "log [count]" in ADMIN_COMMANDS_HELP
+        assert {"stats", "user", "zone", "log"} <= ADMIN_COMMAND_NAMES
 
     def test_admin_commands_detailed_has_all_commands(self):
         """All Phase 8 admin commands should have detailed help."""
-        from bot.main import ADMIN_COMMANDS_DETAILED
+        assert {"stats", "user", "zone", "log"} <= ADMIN_COMMANDS_DETAILED.keys()
 
-        assert "stats" in ADMIN_COMMANDS_DETAILED
-        assert "user" in ADMIN_COMMANDS_DETAILED
-        assert "zone" in ADMIN_COMMANDS_DETAILED
-        assert "log" in ADMIN_COMMANDS_DETAILED
+    def test_every_listed_command_has_detailed_help(self):
+        """Each command in the help list should have a detailed entry (except help itself)."""
+        assert ADMIN_COMMAND_NAMES - {"help"} <= ADMIN_COMMANDS_DETAILED.keys()
 
 
 # ---------------------------------------------------------------------------
@@ -602,26 +632,14 @@ class TestZoneValidation:
 
     def test_zone_exists_in_zones_dict(self):
         """Known zones should be found in the ZONES dict."""
-        from bot.main import ZONES
-
-        found = False
-        for region in ZONES.values():
-            if "Bugis" in region["zones"]:
-                found = True
-                break
-        assert found
+        assert "Bugis" in ALL_ZONES
 
     def test_case_insensitive_zone_lookup(self):
         """Zone lookup should support case-insensitive matching."""
-        from bot.main import ZONES
-
-        target = "bugis"
-        found = False
-        for region in ZONES.values():
-            for z in region["zones"]:
-                if z.lower() == target.lower():
-                    found = True
-                    break
-            if found:
-                break
-        assert found
+        assert resolve_zone("bugis") == "Bugis"
+        assert resolve_zone("TANJONG PAGAR") == "Tanjong Pagar"
+
+    def test_resolve_zone_exact_and_unknown(self):
+        """Exact names resolve to themselves; unknown names resolve to None."""
+        assert resolve_zone("Bugis") == "Bugis"
+        assert resolve_zone("Atlantis") is None
@@ -4,12 +4,35 @@ Tests for user banning, sighting moderation, reporter warnings,
 ban enforcement, auto-flagging, and admin command handlers.
 """
 
-import asyncio
-from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock, patch
+import itertools
+import os
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from bot.main import ADMIN_COMMAND_NAMES, ADMIN_COMMANDS_DETAILED, _check_auto_flag, ban_check
+from config import BOT_VERSION
+
+# Template for test sightings. No test here filters by report time, so one
+# timestamp taken at import serves every test
+_BASE_SIGHTING = {
+    "zone": "Bugis",
+    "description": "Test",
+    "time": datetime.now(timezone.utc),
+    "reporter_id": 100,
+    "reporter_name": "alice",
+    "reporter_badge": "⭐ Regular",
+    "lat": None,
+    "lng": None,
+}
+
+
+def _make_sighting(sighting_id: str, **overrides) -> dict:
+    """Build a sighting payload from _BASE_SIGHTING with the given id and overrides."""
+    return {**_BASE_SIGHTING, "id": sighting_id, **overrides}
+
 
 # ---------------------------------------------------------------------------
 # 9.1 User Banning (Database)
@@ -74,6 +97,42 @@ class TestBanUser:
         await db.ensure_user(100, "alice")
         assert await db.is_banned(100) is False
 
+    @pytest.mark.asyncio
+    async def test_is_banned_cache_invalidated_on_ban_and_unban(self, db):
+        """Cached ban status should be refreshed by ban_user/unban_user."""
+        assert await db.is_banned(100) is False  # populates cache
+
+        await db.ban_user(100, banned_by=999)
+        assert await db.is_banned(100) is True
+
+        await db.unban_user(100)
+        assert await db.is_banned(100) is False
+
+    @pytest.mark.asyncio
+    async def test_is_banned_loads_banned_set_once(self, db):
+        """Lookups within the TTL should be answered without querying again."""
+        await db.ban_user(100, banned_by=999)
+        assert await db.is_banned(100) is True  # loads the snapshot
+        with patch.object(db, "_fetchall", AsyncMock()) as mock_fetchall:
+            assert await db.is_banned(100) is True
+            assert await db.is_banned(200) is False
+        mock_fetchall.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_ban_during_reload_is_not_lost(self, db, monkeypatch):
+        """A ban committed while the TTL reload is reading must survive the reload."""
+        fetchall = db._fetchall
+        pending_bans = [100]
+
+        async def snapshot_then_ban(sql, params=()):
+            rows = await fetchall(sql, params)  # snapshot taken before the ban
+            if pending_bans:
+                await db.ban_user(pending_bans.pop(), banned_by=999)
+            return rows
+
+        monkeypatch.setattr(db, "_fetchall", snapshot_then_ban)
+        assert await db.is_banned(100) is True
+
     @pytest.mark.asyncio
     async def test_get_banned_users_empty(self, db):
         """Should return empty list when no bans exist."""
@@ -81,8 +140,11 @@ class TestBanUser:
         assert banned == []
 
     @pytest.mark.asyncio
-    async def test_get_banned_users_ordering(self, db):
+    async def test_get_banned_users_ordering(self, db, fixed_now, monkeypatch):
         """Should return newest bans first."""
+        # A clock that ticks a second per reading, so the two bans can't share a timestamp
+        ticks = itertools.count()
+        monkeypatch.setattr(db, "_now", lambda: fixed_now + timedelta(seconds=next(ticks)))
         await db.ensure_user(100, "alice")
         await db.ensure_user(200, "bob")
         await db.ban_user(100, banned_by=999, reason="First")
@@ -105,6 +167,16 @@ class TestBanUser:
         subs = await db.get_subscriptions(100)
         assert len(subs) == 0
 
+    @pytest.mark.asyncio
+    async def test_ban_refreshes_cached_subscription_stats(self, db):
+        """Subscriptions cleared by a ban should not linger in cached admin stats."""
+        await db.add_subscription(100, "Bugis")
+        assert (await db.get_global_stats())["active_subscriptions"] == 1
+
+        await db.ban_user(100, banned_by=999)
+
+        assert (await db.get_global_stats())["active_subscriptions"] == 0
+
     @pytest.mark.asyncio
     async def test_get_banned_users_fields(self, db):
         """Should return all expected fields."""
@@ -131,20 +203,7 @@ class TestSightingModeration:
     @pytest.mark.asyncio
     async def test_delete_sighting(self, db):
         """Should delete a sighting and return its data."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "sight1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
+        await db.add_sighting(_make_sighting("sight1"))
 
         deleted = await db.delete_sighting("sight1")
         assert deleted is not None
@@ -164,20 +223,7 @@ class TestSightingModeration:
     @pytest.mark.asyncio
     async def test_delete_sighting_cascades_feedback(self, db):
         """Deleting a sighting should cascade-delete its feedback."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "sight1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
+        await db.add_sighting(_make_sighting("sight1"))
         await db.set_feedback("sight1", 200, "positive")
         await db.set_feedback("sight1", 300, "negative")
 
@@ -187,23 +233,17 @@ class TestSightingModeration:
         feedback = await db.get_user_feedback("sight1", 200)
         assert feedback is None
 
+    @pytest.mark.asyncio
+    async def test_feedback_foreign_key_is_indexed(self, db):
+        """The cascade's lookup of feedback by sighting_id should search an index, not scan."""
+        rows = await db._fetchall("EXPLAIN QUERY PLAN SELECT 1 FROM feedback WHERE sighting_id = ?", ("sight1",))
+        plan = " ".join(r["detail"] for r in rows)
+        assert "SEARCH feedback USING" in plan
+
     @pytest.mark.asyncio
     async def test_flag_sighting(self, db):
         """Should mark a sighting as flagged."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "sight1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
+        await db.add_sighting(_make_sighting("sight1"))
 
         await db.flag_sighting("sight1")
 
@@ -213,37 +253,11 @@ class TestSightingModeration:
     @pytest.mark.asyncio
     async def test_get_flagged_sightings_by_flag(self, db):
         """Should return sightings explicitly marked as flagged."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "flagged1",
-                "zone": "Bugis",
-                "description": "Flagged",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
+        await db.add_sightings_bulk(
+            [_make_sighting("flagged1"), _make_sighting("normal1", reporter_id=200, reporter_name="bob")]
         )
         await db.flag_sighting("flagged1")
 
-        # Add an unflagged sighting
-        await db.add_sighting(
-            {
-                "id": "normal1",
-                "zone": "Bugis",
-                "description": "Normal",
-                "time": now,
-                "reporter_id": 200,
-                "reporter_name": "bob",
-                "reporter_badge": "🆕 New",
-                "lat": None,
-                "lng": None,
-            }
-        )
-
         flagged = await db.get_flagged_sightings()
         assert len(flagged) == 1
         assert flagged[0]["id"] == "flagged1"
@@ -251,27 +265,39 @@ class TestSightingModeration:
     @pytest.mark.asyncio
     async def test_get_flagged_sightings_by_negative_feedback(self, db):
         """Should return sightings with high negative feedback ratio."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "bad_sight",
-                "zone": "Bugis",
-                "description": "Bad report",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
-        # negative > positive with 3+ total votes
-        await db.update_feedback_counts("bad_sight", 1, 3)
+        await db.add_sighting(_make_sighting("bad_sight"))
+        # negative > positive with 3+ total votes, but under the 70% auto-flag threshold
+        await db.update_feedback_counts("bad_sight", 1, 2)
 
         flagged = await db.get_flagged_sightings()
         assert len(flagged) == 1
         assert flagged[0]["id"] == "bad_sight"
 
+    @pytest.mark.asyncio
+    async def test_get_flagged_sightings_flagged_and_disputed_listed_once(self, db):
+        """A sighting matching both conditions should appear once, newest first overall."""
+        await db.add_sightings_bulk([_make_sighting("both"), _make_sighting("disputed")])
+        await db.flag_sighting("both")
+        await db.update_feedback_counts("both", 0, 3)
+        await db.update_feedback_counts("disputed", 1, 2)  # disputed but not auto-flagged
+
+        flagged = await db.get_flagged_sightings()
+        assert sorted(s["id"] for s in flagged) == ["both", "disputed"]
+        assert flagged[0]["reported_at"] >= flagged[1]["reported_at"]
+
+    @pytest.mark.asyncio
+    async def test_get_flagged_sightings_uses_partial_indexes(self, db):
+        """Each branch of the moderation queue query should walk its partial index."""
+        fetchall = db._fetchall
+
+        async def explain(sql, params=()):
+            return await fetchall(f"EXPLAIN QUERY PLAN {sql}", params)
+
+        with patch.object(db, "_fetchall", side_effect=explain):
+            plan = " ".join(r["detail"] for r in await db.get_flagged_sightings())
+        assert "idx_sightings_flagged" in plan
+        assert "idx_sightings_disputed" in plan
+
     @pytest.mark.asyncio
     async def test_get_flagged_sightings_empty(self, db):
         """Should return empty list when no flagged sightings exist."""
@@ -281,20 +307,7 @@ class TestSightingModeration:
     @pytest.mark.asyncio
     async def test_get_flagged_sightings_not_enough_votes(self, db):
         """Sightings with fewer than 3 total votes should not appear."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "few_votes",
-                "zone": "Bugis",
-                "description": "Few votes",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
+        await db.add_sighting(_make_sighting("few_votes"))
         # Only 2 total votes — should not appear
         await db.update_feedback_counts("few_votes", 0, 2)
 
@@ -311,21 +324,8 @@ class TestLowAccuracyReporters:
     @pytest.mark.asyncio
     async def test_get_low_accuracy_reporters(self, db):
         """Should return reporters with accuracy below threshold."""
-        now = datetime.now(timezone.utc)
         # Reporter with 20% accuracy (1 positive, 4 negative = 5 total)
-        await db.add_sighting(
-            {
-                "id": "s1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
+        await db.add_sighting(_make_sighting("s1"))
         await db.update_feedback_counts("s1", 1, 4)
 
         result = await db.get_low_accuracy_reporters(max_accuracy=0.5, min_feedback=5)
@@ -336,20 +336,7 @@ class TestLowAccuracyReporters:
     @pytest.mark.asyncio
     async def test_get_low_accuracy_reporters_above_threshold(self, db):
         """Reporters above the accuracy threshold should not appear."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "s1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
+        await db.add_sighting(_make_sighting("s1"))
         # 80% accuracy — above threshold
         await db.update_feedback_counts("s1", 4, 1)
 
@@ -359,26 +346,42 @@ class TestLowAccuracyReporters:
     @pytest.mark.asyncio
     async def test_get_low_accuracy_reporters_not_enough_feedback(self, db):
         """Reporters with too few feedback ratings should not appear."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "s1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
+        await db.add_sighting(_make_sighting("s1"))
         # Only 3 total feedback — below min_feedback=5
         await db.update_feedback_counts("s1", 1, 2)
 
         result = await db.get_low_accuracy_reporters(max_accuracy=0.5, min_feedback=5)
         assert len(result) == 0
 
+    @pytest.mark.asyncio
+    async def test_get_low_accuracy_reporters_cache_refreshed_by_feedback(self, db):
+        """Cached results should be dropped when feedback counts change."""
+        await db.add_sighting(_make_sighting("s1"))
+        await db.update_feedback_counts("s1", 4, 1)
+        assert await db.get_low_accuracy_reporters(max_accuracy=0.5, min_feedback=5) == []
+
+        await db.update_feedback_counts("s1", -3, 3)  # now 1 positive, 4 negative
+
+        result = await db.get_low_accuracy_reporters(max_accuracy=0.5, min_feedback=5)
+        assert [r["reporter_id"] for r in result] == [100]
+
+    @pytest.mark.parametrize(
+        ("pos", "neg", "max_accuracy", "flagged"),
+        [
+            (55, 45, 0.55, False),  # exactly at the threshold; 0.55 * 100 rounds to 55.00000000000001
+            (54, 46, 0.55, True),
+            (5, 5, 0.5, False),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_get_low_accuracy_reporters_exact_boundary(self, db, pos, neg, max_accuracy, flagged):
+        """Accuracy exactly equal to max_accuracy is not low accuracy."""
+        await db.add_sighting(_make_sighting("s1"))
+        await db.update_feedback_counts("s1", pos, neg)
+
+        result = await db.get_low_accuracy_reporters(max_accuracy=max_accuracy, min_feedback=5)
+        assert bool(result) is flagged
+
     @pytest.mark.asyncio
     async def test_get_low_accuracy_reporters_empty(self, db):
         """Should return empty list when no reporters exist."""
@@ -414,6 +417,12 @@ class TestWarnings:
         count = await db.increment_warnings(100)
         assert count == 2
 
+    @pytest.mark.asyncio
+    async def test_increment_warnings_unknown_user(self, db):
+        """Warning an unregistered user should return 0 and not create a row."""
+        assert await db.increment_warnings(999) == 0
+        assert await db.get_user_details(999) is None
+
     @pytest.mark.asyncio
     async def test_reset_warnings(self, db):
         """Should reset warnings to zero."""
@@ -450,20 +459,7 @@ class TestPhase9Schema:
     @pytest.mark.asyncio
     async def test_sightings_flagged_column_exists(self, db):
         """sightings table should have flagged column."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "s1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
+        await db.add_sighting(_make_sighting("s1"))
         sighting = await db.get_sighting("s1")
         assert sighting["flagged"] == 0
 
@@ -478,20 +474,7 @@ class TestPhase9Schema:
     @pytest.mark.asyncio
     async def test_flagged_default_zero(self, db):
         """New sightings should have flagged = 0."""
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "s1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
+        await db.add_sighting(_make_sighting("s1"))
         sighting = await db.get_sighting("s1")
         assert sighting["flagged"] == 0
 
@@ -502,29 +485,17 @@ class TestPhase9Schema:
 class TestMaxWarningsConfig:
     """Tests for MAX_WARNINGS configuration."""
 
-    def test_max_warnings_default(self):
-        """MAX_WARNINGS should default to 3."""
-        import os
-        from unittest.mock import patch as _patch
-
-        with _patch.dict(os.environ, {}, clear=False):
-            # Re-parse
-            val = int(os.environ.get("MAX_WARNINGS", "3"))
-            assert val == 3
-
-    def test_max_warnings_custom(self):
-        """MAX_WARNINGS should be configurable via env var."""
-        import os
-        from unittest.mock import patch as _patch
-
-        with _patch.dict(os.environ, {"MAX_WARNINGS": "5"}, clear=False):
-            val = int(os.environ.get("MAX_WARNINGS", "3"))
-            assert val == 5
+    @pytest.mark.parametrize(("env", "expected"), [(None, 3), ("5", 5)], ids=["default", "custom"])
+    def test_max_warnings(self, monkeypatch, env, expected):
+        """MAX_WARNINGS should default to 3 and be configurable via env var."""
+        if env is None:
+            monkeypatch.delenv("MAX_WARNINGS", raising=False)
+        else:
+            monkeypatch.setenv("MAX_WARNINGS", env)
+        assert int(os.environ.get("MAX_WARNINGS", "3")) == expected
 
     def test_bot_version_updated(self):
         """Bot version should be bumped for Phase 9."""
-        from config import BOT_VERSION
-
         assert BOT_VERSION == "1.3.0"
 
 
@@ -534,55 +505,46 @@ class TestMaxWarningsConfig:
 class TestBanCheck:
     """Tests for the ban_check decorator."""
 
-    def test_ban_check_blocks_banned_user(self):
-        """Banned users should receive a restriction message."""
-        from bot.main import ban_check
+    @pytest.fixture
+    def ban_db(self):
+        """Stand-in for the database; each test sets is_banned's return value."""
+        mock_db = SimpleNamespace(is_banned=AsyncMock())
+        with patch("bot.services.moderation.get_db", return_value=mock_db):
+            yield mock_db
 
+    @pytest.mark.asyncio
+    async def test_ban_check_blocks_banned_user(self, ban_db, fake_update):
+        """Banned users should receive a restriction message."""
         called = False
 
         async def handler(update, context):
             nonlocal called
             called = True
 
-        decorated = ban_check(handler)
-
-        update = MagicMock()
-        update.effective_user.id = 100
-        update.message.reply_text = AsyncMock()
-
-        mock_db = MagicMock()
-        mock_db.is_banned = AsyncMock(return_value=True)
-
-        with patch("bot.services.moderation.get_db", return_value=mock_db):
-            asyncio.get_event_loop().run_until_complete(decorated(update, MagicMock()))
+        ban_db.is_banned.return_value = True
+        update = fake_update(100)
+        await ban_check(handler)(update, None)
 
         assert not called
+        ban_db.is_banned.assert_awaited_once_with(100)
         update.message.reply_text.assert_called_once()
         assert "restricted" in update.message.reply_text.call_args[0][0].lower()
 
-    def test_ban_check_allows_non_banned_user(self):
+    @pytest.mark.asyncio
+    async def test_ban_check_allows_non_banned_user(self, ban_db, fake_update):
         """Non-banned users should pass through."""
-        from bot.main import ban_check
-
         called = False
 
         async def handler(update, context):
             nonlocal called
             called = True
 
-        decorated = ban_check(handler)
-
-        update = MagicMock()
-        update.effective_user.id = 100
-        update.message.reply_text = AsyncMock()
-
-        mock_db = MagicMock()
-        mock_db.is_banned = AsyncMock(return_value=False)
-
-        with patch("bot.services.moderation.get_db", return_value=mock_db):
-            asyncio.get_event_loop().run_until_complete(decorated(update, MagicMock()))
+        ban_db.is_banned.return_value = False
+        update = fake_update(100)
+        await ban_check(handler)(update, None)
 
         assert called
+        update.message.reply_text.assert_not_called()
 
 
 # ---------------------------------------------------------------------------
@@ -591,97 +553,42 @@ class TestBanCheck:
 class TestAutoFlag:
     """Tests for the auto-flag sighting logic."""
 
-    @pytest.mark.asyncio
-    async def test_auto_flag_triggers_on_high_negative(self, db):
-        """Sighting should be flagged when negative > 70% with 3+ votes."""
-        from bot.main import _check_auto_flag
-
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "auto1",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
+    @pytest.mark.parametrize(
+        ("pos", "neg", "expected"),
+        [
+            (1, 3, 1),  # 75% negative
+            (3, 7, 0),  # exactly 70% is not over the threshold
+            (2, 2, 0),  # 50% negative
+            (0, 2, 0),  # 100% negative, but fewer than 3 votes
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_auto_flag_threshold(self, db, pos, neg, expected):
+        """Sightings are flagged only when negative > 70% with 3+ votes."""
+        await db.add_sighting(_make_sighting("auto1"))
+        # Set the counts directly; update_feedback_counts would already auto-flag
+        await db._execute(
+            "UPDATE sightings SET feedback_positive = ?, feedback_negative = ? WHERE id = ?", (pos, neg, "auto1")
         )
-        # Set 1 positive, 3 negative (75% negative)
-        await db.update_feedback_counts("auto1", 1, 3)
 
-        with patch("bot.services.moderation.get_db", return_value=db):
-            await _check_auto_flag("auto1")
+        await _check_auto_flag("auto1", db=db)
 
         sighting = await db.get_sighting("auto1")
-        assert sighting["flagged"] == 1
-
-    @pytest.mark.asyncio
-    async def test_auto_flag_does_not_trigger_under_threshold(self, db):
-        """Sighting should NOT be flagged when negative <= 70%."""
-        from bot.main import _check_auto_flag
-
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "auto2",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
-        # Set 2 positive, 2 negative (50% negative — below 70%)
-        await db.update_feedback_counts("auto2", 2, 2)
-
-        with patch("bot.services.moderation.get_db", return_value=db):
-            await _check_auto_flag("auto2")
-
-        sighting = await db.get_sighting("auto2")
-        assert sighting["flagged"] == 0
+        assert sighting["flagged"] == expected
 
     @pytest.mark.asyncio
-    async def test_auto_flag_requires_minimum_votes(self, db):
-        """Should not flag with fewer than 3 total votes."""
-        from bot.main import _check_auto_flag
-
-        now = datetime.now(timezone.utc)
-        await db.add_sighting(
-            {
-                "id": "auto3",
-                "zone": "Bugis",
-                "description": "Test",
-                "time": now,
-                "reporter_id": 100,
-                "reporter_name": "alice",
-                "reporter_badge": "⭐ Regular",
-                "lat": None,
-                "lng": None,
-            }
-        )
-        # Only 2 votes (100% negative, but not enough votes)
-        await db.update_feedback_counts("auto3", 0, 2)
+    async def test_update_feedback_counts_auto_flags(self, db):
+        """Adjusting counts past the threshold should flag in the same write."""
+        await db.add_sighting(_make_sighting("auto4"))
+        await db.update_feedback_counts("auto4", 1, 3)
 
-        with patch("bot.services.moderation.get_db", return_value=db):
-            await _check_auto_flag("auto3")
-
-        sighting = await db.get_sighting("auto3")
-        assert sighting["flagged"] == 0
+        sighting = await db.get_sighting("auto4")
+        assert sighting["flagged"] == 1
 
     @pytest.mark.asyncio
     async def test_auto_flag_nonexistent_sighting(self, db):
         """Should handle non-existent sighting gracefully."""
-        from bot.main import _check_auto_flag
-
-        with patch("bot.services.moderation.get_db", return_value=db):
-            await _check_auto_flag("nonexistent")  # Should not raise
+        await _check_auto_flag("nonexistent", db=db)  # Should not raise
 
 
 # ---------------------------------------------------------------------------
@@ -692,26 +599,11 @@ class TestAdminHelpPhase9:
 
     def test_admin_commands_help_has_phase9_commands(self):
         """Phase 9 admin commands should be listed in help."""
-        from bot.main import ADMIN_COMMANDS_HELP
-
-        help_keys = " ".join(ADMIN_COMMANDS_HELP.keys())
-        assert "ban" in help_keys
-        assert "unban" in help_keys
-        assert "banlist" in ADMIN_COMMANDS_HELP
-        assert "warn" in help_keys
-        assert "delete" in help_keys
-        assert "review" in ADMIN_COMMANDS_HELP
+        assert {"ban", "unban", "banlist", "warn", "delete", "review"} <= ADMIN_COMMAND_NAMES
 
     def test_admin_commands_detailed_has_phase9_commands(self):
         """Phase 9 admin commands should have detailed help."""
-        from bot.main import ADMIN_COMMANDS_DETAILED
-
-        assert "ban" in ADMIN_COMMANDS_DETAILED
-        assert "unban" in ADMIN_COMMANDS_DETAILED
-        assert "banlist" in ADMIN_COMMANDS_DETAILED
-        assert "warn" in ADMIN_COMMANDS_DETAILED
-        assert "delete" in ADMIN_COMMANDS_DETAILED
-        assert "review" in ADMIN_COMMANDS_DETAILED
+        assert {"ban", "unban", "banlist", "warn", "delete", "review"} <= ADMIN_COMMANDS_DETAILED.keys()
 
 
 # ---------------------------------------------------------------------------
@@ -1,12 +1,23 @@
 """Unit tests for pure functions in bot.main.
 
 Tests: haversine_meters, get_reporter_badge, get_accuracy_indicator,
-       sanitize_description, build_alert_message, generate_sighting_id.
+       sanitize_description, build_alert_message, generate_sighting_id,
+       json_dumps.
 """
 
+import bisect
+import json
+import math
+import random
+from collections import Counter
 from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
 
 from bot.main import (
+    ALL_ZONES,
     ZONE_COORDS,
     ZONES,
     build_alert_message,
@@ -16,48 +27,62 @@ from bot.main import (
     haversine_meters,
     sanitize_description,
 )
-
+from bot.utils import json_dumps
 
 # ---------------------------------------------------------------------------
 # haversine_meters
 # ---------------------------------------------------------------------------
-class TestHaversineMeters:
-    """Tests for the Haversine distance function."""
+_TANJONG_PAGAR = ZONE_COORDS["Tanjong Pagar"]
+_BUGIS = ZONE_COORDS["Bugis"]
+_WOODLANDS = ZONE_COORDS["Woodlands"]
+
 
-    def test_same_point_returns_zero(self):
-        assert haversine_meters(1.3521, 103.8198, 1.3521, 103.8198) == 0.0
+def _chord_distance(a, b):
+    """Great-circle distance in meters from the straight-line chord between unit vectors.
 
-    def test_known_distance_tanjong_pagar_to_bugis(self):
-        """Tanjong Pagar to Bugis is roughly 2.7-2.8 km."""
-        tp = ZONE_COORDS["Tanjong Pagar"]
-        bg = ZONE_COORDS["Bugis"]
-        dist = haversine_meters(tp[0], tp[1], bg[0], bg[1])
-        assert 2500 < dist < 3200
+    An independent formulation to check haversine_meters against.
+    """
 
-    def test_short_distance_within_duplicate_radius(self):
-        """Two points 100m apart should be under 200m threshold."""
-        # ~100m north of Tanjong Pagar
-        lat1, lng1 = 1.2764, 103.8460
-        lat2, lng2 = 1.2773, 103.8460  # roughly 100m north
-        dist = haversine_meters(lat1, lng1, lat2, lng2)
-        assert dist < 200
+    def unit(lat, lng):
+        phi, lam = math.radians(lat), math.radians(lng)
+        return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+    chord = math.dist(unit(*a), unit(*b))
+    return 2 * 6_371_000 * math.asin(chord / 2)
+
+
+class TestHaversineMeters:
+    """Tests for the Haversine distance function."""
+
+    @pytest.mark.parametrize(
+        ("a", "b", "lo", "hi"),
+        [
+            ((1.3521, 103.8198), (1.3521, 103.8198), 0, 0),
+            (_TANJONG_PAGAR, _BUGIS, 2500, 3200),  # roughly 2.7-2.8 km
+            ((1.2764, 103.8460), (1.2773, 103.8460), 0, 200),  # ~100m apart, inside the duplicate radius
+            (_WOODLANDS, _TANJONG_PAGAR, 15_000, 20_000),  # ~17-19 km, north to south
+            ((1.0, 100.0), (2.0, 101.0), 1, 200_000),
+        ],
+        ids=["same-point", "tanjong-pagar-to-bugis", "within-duplicate-radius", "cross-island", "positive"],
+    )
+    def test_distance(self, a, b, lo, hi):
+        assert lo <= haversine_meters(*a, *b) <= hi
 
     def test_symmetry(self):
         """Distance A→B should equal distance B→A."""
         a = (1.3521, 103.8198)
         b = (1.2764, 103.8460)
-        assert haversine_meters(*a, *b) == haversine_meters(*b, *a)
+        # Within a nanometre rather than bit-identical, so a reordered or FMA-compiled formula still passes
+        assert math.isclose(haversine_meters(*a, *b), haversine_meters(*b, *a), rel_tol=0, abs_tol=1e-9)
 
-    def test_large_distance_cross_island(self):
-        """Woodlands to Tanjong Pagar is ~17-19 km (north to south)."""
-        wl = ZONE_COORDS["Woodlands"]
-        tp = ZONE_COORDS["Tanjong Pagar"]
-        dist = haversine_meters(wl[0], wl[1], tp[0], tp[1])
-        assert 15_000 < dist < 20_000
-
-    def test_always_positive(self):
-        dist = haversine_meters(1.0, 100.0, 2.0, 101.0)
-        assert dist > 0
+    def test_matches_chord_formula_for_all_zone_pairs(self):
+        mismatches = [
+            (zone_a, zone_b)
+            for zone_a, a in ZONE_COORDS.items()
+            for zone_b, b in ZONE_COORDS.items()
+            if not math.isclose(haversine_meters(*a, *b), _chord_distance(a, b), rel_tol=1e-9, abs_tol=1e-6)
+        ]
+        assert not mismatches
 
 
 # ---------------------------------------------------------------------------
@@ -66,29 +91,28 @@ class TestHaversineMeters:
 class TestGetReporterBadge:
     """Tests for badge assignment based on report count."""
 
-    def test_new_badge_zero_reports(self):
-        assert get_reporter_badge(0) == "🆕 New"
-
-    def test_new_badge_two_reports(self):
-        assert get_reporter_badge(2) == "🆕 New"
-
-    def test_regular_badge_boundary(self):
-        assert get_reporter_badge(3) == "⭐ Regular"
-
-    def test_regular_badge_ten_reports(self):
-        assert get_reporter_badge(10) == "⭐ Regular"
-
-    def test_trusted_badge_boundary(self):
-        assert get_reporter_badge(11) == "⭐⭐ Trusted"
-
-    def test_trusted_badge_fifty_reports(self):
-        assert get_reporter_badge(50) == "⭐⭐ Trusted"
-
-    def test_veteran_badge_boundary(self):
-        assert get_reporter_badge(51) == "🏆 Veteran"
-
-    def test_veteran_badge_high_count(self):
-        assert get_reporter_badge(999) == "🏆 Veteran"
+    @pytest.mark.parametrize(
+        ("report_count", "badge"),
+        [
+            (0, "🆕 New"),
+            (2, "🆕 New"),
+            (3, "⭐ Regular"),
+            (10, "⭐ Regular"),
+            (11, "⭐⭐ Trusted"),
+            (50, "⭐⭐ Trusted"),
+            (51, "🏆 Veteran"),
+            (999, "🏆 Veteran"),
+        ],
+    )
+    def test_badge(self, report_count, badge):
+        assert get_reporter_badge(report_count) == badge
+
+    def test_every_count_up_to_1000(self):
+        """Each count gets the badge of the highest threshold (3, 11, 51) it reaches."""
+        thresholds = [3, 11, 51]
+        labels = ["🆕 New", "⭐ Regular", "⭐⭐ Trusted", "🏆 Veteran"]
+        wrong = [n for n in range(1000) if get_reporter_badge(n) != labels[bisect.bisect_right(thresholds, n)]]
+        assert not wrong, f"Unexpected badge for report counts: {wrong}"
 
 
 # ---------------------------------------------------------------------------
@@ -97,33 +121,24 @@ class TestGetReporterBadge:
 class TestGetAccuracyIndicator:
     """Tests for accuracy indicator based on score and feedback count."""
 
-    def test_not_enough_data_returns_empty(self):
-        assert get_accuracy_indicator(1.0, 0) == ""
-        assert get_accuracy_indicator(1.0, 1) == ""
-        assert get_accuracy_indicator(1.0, 2) == ""
-
-    def test_threshold_three_ratings_shows_indicator(self):
-        assert get_accuracy_indicator(1.0, 3) == "✅"
-
-    def test_high_accuracy(self):
-        assert get_accuracy_indicator(0.9, 10) == "✅"
-        assert get_accuracy_indicator(0.8, 5) == "✅"
-
-    def test_mixed_accuracy(self):
-        assert get_accuracy_indicator(0.79, 5) == "⚠️"
-        assert get_accuracy_indicator(0.5, 10) == "⚠️"
-
-    def test_low_accuracy(self):
-        assert get_accuracy_indicator(0.49, 5) == "❌"
-        assert get_accuracy_indicator(0.0, 10) == "❌"
-
-    def test_boundary_80_percent(self):
-        """Exactly 0.8 should be high accuracy."""
-        assert get_accuracy_indicator(0.8, 5) == "✅"
-
-    def test_boundary_50_percent(self):
-        """Exactly 0.5 should be mixed accuracy."""
-        assert get_accuracy_indicator(0.5, 5) == "⚠️"
+    @pytest.mark.parametrize(
+        ("score", "total", "indicator"),
+        [
+            # Fewer than 3 ratings shows nothing
+            pytest.param(1.0, 0, "", id="no-ratings"),
+            pytest.param(1.0, 1, "", id="one-rating"),
+            pytest.param(1.0, 2, "", id="two-ratings"),
+            pytest.param(1.0, 3, "✅", id="three-ratings"),
+            pytest.param(0.9, 10, "✅", id="high"),
+            pytest.param(0.8, 5, "✅", id="boundary-80"),  # exactly 0.8 is high accuracy
+            pytest.param(0.79, 5, "⚠️", id="just-below-80"),
+            pytest.param(0.5, 5, "⚠️", id="boundary-50"),  # exactly 0.5 is mixed accuracy
+            pytest.param(0.49, 5, "❌", id="just-below-50"),
+            pytest.param(0.0, 10, "❌", id="zero"),
+        ],
+    )
+    def test_indicator(self, score, total, indicator):
+        assert get_accuracy_indicator(score, total) == indicator
 
 
 # ---------------------------------------------------------------------------
@@ -132,77 +147,99 @@ class TestGetAccuracyIndicator:
 class TestSanitizeDescription:
     """Tests for input sanitization."""
 
-    def test_none_input(self):
-        assert sanitize_description(None) is None
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            (None, None),
+            ("", None),
+            ("   ", None),
+            ("outside Maxwell Food Centre", "outside Maxwell Food Centre"),
+            ("  hello  ", "hello"),
+            ("Block   123    carpark", "Block 123 carpark"),
+            ("<b>bold</b> text", "bold text"),
+            ("<script>alert('xss')</script>", "alert('xss')"),
+            ("hello\x00world", "helloworld"),
+            ("hello\x01world", "helloworld"),
+            ("x" * 150, "x" * 100),
+            ("  <b>Hello</b>   \x00world   ", "Hello world"),  # HTML + whitespace + control chars at once
+            ("<br><hr>", None),  # tags only: nothing left after stripping
+        ],
+        ids=[
+            "none",
+            "empty",
+            "whitespace-only",
+            "normal-text-unchanged",
+            "strips-outer-whitespace",
+            "collapses-whitespace",
+            "strips-html-tags",
+            "strips-script-tag",
+            "removes-nul",
+            "removes-control-char",
+            "truncates-to-100",
+            "combined",
+            "empty-after-cleanup",
+        ],
+    )
+    def test_sanitize(self, text, expected):
+        assert sanitize_description(text) == expected
+
+    def test_noisy_corpus(self):
+        """Whatever goes in, the result is None or clean, trimmed text of at most 100 characters."""
+        rng = random.Random(0)
+        pieces = ["<b>", "</b>", "<br>", "\x00", "\x07", "  ", "\t", "\n", "Block 123", "carpark", "x" * 40, "é"]
+        for _ in range(10_000):
+            text = "".join(rng.choices(pieces, k=rng.randint(0, 8)))
+            result = sanitize_description(text)
+            if result is None:
+                continue
+            assert len(result) <= 100
+            assert result == result.strip()
+            assert "<" not in result and "  " not in result
+            assert not any(ch in result for ch in "\x00\x07\t\n")
 
-    def test_empty_string(self):
-        assert sanitize_description("") is None
 
-    def test_whitespace_only(self):
-        assert sanitize_description("   ") is None
-
-    def test_normal_text_unchanged(self):
-        assert sanitize_description("outside Maxwell Food Centre") == "outside Maxwell Food Centre"
-
-    def test_strips_leading_trailing_whitespace(self):
-        assert sanitize_description("  hello  ") == "hello"
-
-    def test_collapses_multiple_whitespace(self):
-        assert sanitize_description("Block   123    carpark") == "Block 123 carpark"
-
-    def test_strips_html_tags(self):
-        assert sanitize_description("<b>bold</b> text") == "bold text"
-        assert sanitize_description("<script>alert('xss')</script>") == "alert('xss')"
+# ---------------------------------------------------------------------------
+# build_alert_message
+# ---------------------------------------------------------------------------
+_BASE_SIGHTING = {
+    "zone": "Tanjong Pagar",
+    "reported_at": datetime(2026, 2, 13, 6, 30, 0, tzinfo=timezone.utc),
+    "description": "outside Maxwell Food Centre",
+    "lat": 1.276432,
+    "lng": 103.846021,
+}
 
-    def test_removes_control_characters(self):
-        assert sanitize_description("hello\x00world") == "helloworld"
-        assert sanitize_description("hello\x01world") == "helloworld"
 
-    def test_truncates_to_100_characters(self):
-        long_text = "x" * 150
-        result = sanitize_description(long_text)
-        assert len(result) == 100
+@pytest.fixture(scope="module")
+def default_alert():
+    """The alert for the unmodified template sighting with no feedback, rendered once for the module."""
+    return build_alert_message(_BASE_SIGHTING, pos=0, neg=0, badge="⭐ Regular", accuracy_indicator="✅")
 
-    def test_combined_sanitization(self):
-        """HTML + whitespace + control chars all at once."""
-        text = "  <b>Hello</b>   \x00world   "
-        assert sanitize_description(text) == "Hello world"
 
-    def test_result_empty_after_cleanup(self):
-        """Tags-only input should return None after stripping."""
-        assert sanitize_description("<br><hr>") is None
+def _assert_fragments(msg, present=(), absent=()):
+    """Check a rendered message for expected and forbidden fragments, reporting every mismatch at once."""
+    missing = [fragment for fragment in present if fragment not in msg]
+    unexpected = [fragment for fragment in absent if fragment in msg]
+    assert not missing and not unexpected, f"missing {missing}, unexpected {unexpected} in:\n{msg}"
 
 
-# ---------------------------------------------------------------------------
-# build_alert_message
-# ---------------------------------------------------------------------------
 class TestBuildAlertMessage:
     """Tests for alert message construction."""
 
     def _make_sighting(self, **overrides):
-        base = {
-            "zone": "Tanjong Pagar",
-            "reported_at": datetime(2026, 2, 13, 6, 30, 0, tzinfo=timezone.utc),
-            "description": "outside Maxwell Food Centre",
-            "lat": 1.276432,
-            "lng": 103.846021,
-        }
-        base.update(overrides)
-        return base
-
-    def test_basic_alert_with_all_fields(self):
-        msg = build_alert_message(
-            self._make_sighting(),
-            pos=0,
-            neg=0,
-            badge="⭐ Regular",
-            accuracy_indicator="✅",
+        return {**_BASE_SIGHTING, **overrides}
+
+    def test_basic_alert_with_all_fields(self, default_alert):
+        _assert_fragments(
+            default_alert,
+            present=(
+                "WARDEN ALERT — Tanjong Pagar",
+                "outside Maxwell Food Centre",
+                "1.276432",
+                "⭐ Regular ✅",
+                "Was this accurate?",
+            ),
         )
-        assert "WARDEN ALERT — Tanjong Pagar" in msg
-        assert "outside Maxwell Food Centre" in msg
-        assert "1.276432" in msg
-        assert "⭐ Regular ✅" in msg
-        assert "Was this accurate?" in msg
 
     def test_alert_without_description(self):
         msg = build_alert_message(
@@ -212,8 +249,7 @@ class TestBuildAlertMessage:
             badge="🆕 New",
             accuracy_indicator="",
         )
-        assert "📝 Location:" not in msg
-        assert "🆕 New" in msg
+        _assert_fragments(msg, present=("🆕 New",), absent=("📝 Location:",))
 
     def test_alert_without_gps(self):
         msg = build_alert_message(
@@ -234,31 +270,18 @@ class TestBuildAlertMessage:
             accuracy_indicator="✅",
             feedback_received=True,
         )
-        assert "📊 Feedback: 👍 5 / 👎 1" in msg
-        assert "Thanks for your feedback!" in msg
-        assert "Was this accurate?" not in msg
-
-    def test_alert_without_feedback(self):
-        msg = build_alert_message(
-            self._make_sighting(),
-            pos=0,
-            neg=0,
-            badge="⭐ Regular",
-            accuracy_indicator="✅",
+        _assert_fragments(
+            msg,
+            present=("📊 Feedback: 👍 5 / 👎 1", "Thanks for your feedback!"),
+            absent=("Was this accurate?",),
         )
-        assert "Was this accurate?" in msg
-        assert "📊 Feedback:" not in msg
 
-    def test_sgt_time_display(self):
+    def test_alert_without_feedback(self, default_alert):
+        _assert_fragments(default_alert, present=("Was this accurate?",), absent=("📊 Feedback:",))
+
+    def test_sgt_time_display(self, default_alert):
         """UTC 06:30 should display as 02:30 PM SGT (UTC+8)."""
-        msg = build_alert_message(
-            self._make_sighting(),
-            pos=0,
-            neg=0,
-            badge="⭐ Regular",
-            accuracy_indicator="",
-        )
-        assert "02:30 PM SGT" in msg
+        assert "02:30 PM SGT" in default_alert
 
     def test_naive_datetime_treated_as_utc(self):
         """A naive datetime should be treated as UTC for display."""
@@ -286,6 +309,35 @@ class TestBuildAlertMessage:
         assert "👤 Reporter: 🆕 New\n" in msg
 
 
+# ---------------------------------------------------------------------------
+# json_dumps
+# ---------------------------------------------------------------------------
+class TestJsonDumps:
+    """Tests for the orjson-with-stdlib-fallback JSON encoder."""
+
+    def test_returns_compact_utf8_bytes(self):
+        out = json_dumps({"zone": "Bugis", "n": 1})
+        assert isinstance(out, bytes)
+        assert json.loads(out) == {"zone": "Bugis", "n": 1}
+
+    def test_unsupported_values_are_stringified(self):
+        assert json.loads(json_dumps({"v": Decimal("1.50")})) == {"v": "1.50"}
+
+    def test_stdlib_fallback_matches(self):
+        payload = {"message": "caf\u00e9 \u2014 multi\nline", "n": 2**70}
+        with patch("bot.utils.orjson", None):
+            fallback = json_dumps(payload)
+        assert json.loads(fallback) == json.loads(json_dumps(payload)) == payload
+
+    def test_lone_surrogate_is_escaped(self):
+        """A string that can't be UTF-8 encoded comes out \\u-escaped instead of raising."""
+        with patch("bot.utils.orjson", None):
+            fallback = json_dumps({"message": "x\ud800y"})
+        for out in (json_dumps({"message": "x\ud800y"}), fallback):
+            assert b"\\ud800" in out
+            assert json.loads(out) == {"message": "x\ud800y"}
+
+
 # ---------------------------------------------------------------------------
 # generate_sighting_id
 # ---------------------------------------------------------------------------
@@ -304,8 +356,9 @@ class TestGenerateSightingId:
         assert parts[2][0] == "4"  # version 4
 
     def test_unique_ids(self):
-        ids = {generate_sighting_id() for _ in range(100)}
-        assert len(ids) == 100
+        ids = Counter(generate_sighting_id() for _ in range(10_000))
+        duplicates = [sid for sid, count in ids.items() if count > 1]
+        assert not duplicates, f"Duplicate sighting IDs: {duplicates}"
 
 
 # ---------------------------------------------------------------------------
@@ -324,15 +377,17 @@ class TestZoneData:
 
     def test_all_zones_have_coordinates(self):
         """Every zone in ZONES should have an entry in ZONE_COORDS."""
-        for region in ZONES.values():
-            for zone in region["zones"]:
-                assert zone in ZONE_COORDS, f"Missing coordinates for zone: {zone}"
+        missing = set(ALL_ZONES) - ZONE_COORDS.keys()
+        assert not missing, f"Missing coordinates for zones: {sorted(missing)}"
 
     def test_zone_coords_count_matches(self):
         assert len(ZONE_COORDS) == 80
 
     def test_coordinates_in_singapore(self):
         """All coordinates should be within Singapore bounding box."""
-        for zone, (lat, lng) in ZONE_COORDS.items():
-            assert 1.15 < lat < 1.48, f"{zone} latitude {lat} outside Singapore"
-            assert 103.60 < lng < 104.10, f"{zone} longitude {lng} outside Singapore"
+        outside = [
+            (zone, lat, lng)
+            for zone, (lat, lng) in ZONE_COORDS.items()
+            if not (1.15 < lat < 1.48 and 103.60 < lng < 104.10)
+        ]
+        assert not outside, f"Coordinates outside Singapore: {outside}"